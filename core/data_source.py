@@ -3,12 +3,13 @@ Data Source module - handles loading and managing source data files.
 """
 import uuid
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 from pathlib import Path
 
 import pandas as pd
 
 from utils.key_normalizer import normalize_key
+from utils.workers import shutdown_requested
 
 
 @dataclass
@@ -26,11 +27,29 @@ class DataSource:
     # Computed after loading
     match_stats: Dict[str, int] = field(default_factory=dict)
     _key_lookup: Dict[str, Dict[str, Any]] = field(default_factory=dict, repr=False)
+    _columns_cache: Optional[Tuple[str, ...]] = field(default=None, repr=False, compare=False)
+    _shape_cache: Optional[Tuple[int, int]] = field(default=None, repr=False, compare=False)
+    _workbook: Optional[pd.ExcelFile] = field(default=None, repr=False, compare=False)
+    
+    # Bumped whenever the data changes (reassigned or edited in place)
+    data_version: int = field(default=0, repr=False, compare=False)
     
     def __post_init__(self):
         if self.filepath and not self.filename:
             self.filename = Path(self.filepath).name
     
+    def __setattr__(self, name: str, value: Any):
+        # Reassigning the dataframe invalidates the cached column names and shape
+        if name == 'dataframe':
+            self.mark_data_changed()
+        object.__setattr__(self, name, value)
+    
+    def mark_data_changed(self):
+        """Invalidate cached data info after the dataframe was edited in place."""
+        object.__setattr__(self, '_columns_cache', None)
+        object.__setattr__(self, '_shape_cache', None)
+        object.__setattr__(self, 'data_version', getattr(self, 'data_version', 0) + 1)
+    
     @classmethod
     def from_file(cls, filepath: str, sheet: Optional[str] = None, 
                   key_column: str = "", key_options: Optional[Dict] = None) -> 'DataSource':
@@ -53,28 +72,64 @@ class DataSource:
         
         return source
     
-    def load(self, sheet: Optional[str] = None) -> List[str]:
-        """Load data from file, returns list of available sheets."""
-        from utils.file_handlers import load_file
+    def load(self, sheet: Optional[str] = None, keep_workbook: bool = False) -> List[str]:
+        """
+        Load data from file, returns list of available sheets.
         
-        df, sheets = load_file(self.filepath, sheet or self.sheet)
-        self.dataframe = df
+        keep_workbook keeps a multi-sheet workbook open in memory so
+        switch_sheet can parse another sheet without rereading the file.
+        """
+        from utils.file_handlers import load_file, open_excel, read_excel_sheet, EXCEL_EXTENSIONS
+        
+        self._workbook = None
+        if Path(self.filepath).suffix.lower() in EXCEL_EXTENSIONS:
+            xl = open_excel(self.filepath, in_memory=True)
+            self.dataframe = read_excel_sheet(xl, sheet or self.sheet)
+            sheets = xl.sheet_names
+            # Keep multi-sheet workbooks open so switch_sheet parses only one sheet
+            if keep_workbook and len(sheets) > 1:
+                self._workbook = xl
+            else:
+                xl.close()
+        else:
+            df, sheets = load_file(self.filepath, sheet or self.sheet)
+            self.dataframe = df
         if sheet:
             self.sheet = sheet
         
         return sheets
     
-    def get_columns(self) -> List[str]:
-        """Get list of column names."""
+    def switch_sheet(self, sheet: str):
+        """Show another sheet of the loaded workbook."""
+        from utils.file_handlers import read_excel_sheet
+        
+        if self._workbook is None:
+            self.load(sheet, keep_workbook=True)
+            return
+        
+        self.dataframe = read_excel_sheet(self._workbook, sheet)
+        self.sheet = sheet
+    
+    def get_columns(self) -> Tuple[str, ...]:
+        """Get column names (cached until the dataframe is reassigned)."""
         if self.dataframe is None:
-            return []
-        return list(self.dataframe.columns)
+            return ()
+        if self._columns_cache is None:
+            self._columns_cache = tuple(self.dataframe.columns)
+        return self._columns_cache
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, columns) of the data (cached until the dataframe is reassigned)."""
+        if self.dataframe is None:
+            return (0, 0)
+        if self._shape_cache is None:
+            self._shape_cache = self.dataframe.shape
+        return self._shape_cache
     
     def get_row_count(self) -> int:
         """Get number of rows."""
-        if self.dataframe is None:
-            return 0
-        return len(self.dataframe)
+        return self.shape[0]
     
     def set_key_column(self, column: str):
         """Set the key column and rebuild lookup."""
@@ -103,6 +158,7 @@ class DataSource:
                 # But if it's 123.9, maybe they want 123 or 124? 
                 # Usually it's 123.0.
                 self.dataframe[self.key_column] = col_data.astype('Int64').astype(str).replace('<NA>', 'nan')
+                self.mark_data_changed()
                 return
             except Exception:
                 # Fallback if conversion fails
@@ -113,6 +169,7 @@ class DataSource:
         s_data = col_data.astype(str)
         if s_data.str.endswith('.0').any():
             self.dataframe[self.key_column] = s_data.str.replace(r'\.0$', '', regex=True)
+            self.mark_data_changed()
     
     def build_key_lookup(self, force: bool = False):
         """Build a dictionary mapping normalized keys to row data.
@@ -130,10 +187,16 @@ class DataSource:
         if hasattr(self, '_key_lookup_built') and self._key_lookup_built and not force:
             return
         
-        self._key_lookup = {}
-        self._key_all_rows = {}  # Store ALL rows for each key
+        # Build into locals and swap at the end, so a concurrent reader
+        # never sees a half-built index
+        key_lookup = {}
+        key_all_rows = {}  # Store ALL rows for each key
         
-        for idx, row in self.dataframe.iterrows():
+        for n, (idx, row) in enumerate(self.dataframe.iterrows()):
+            # Stop early when the application is closing
+            if n % 2000 == 0 and shutdown_requested():
+                raise InterruptedError("Operation cancelled")
+            
             raw_key = row.get(self.key_column)
             
             # Minimal cleanup for source keys (only .0 removal, whitespace)
@@ -158,14 +221,16 @@ class DataSource:
             
             for variant in key_variants:
                 # Store in all_rows list for each variant
-                if variant not in self._key_all_rows:
-                    self._key_all_rows[variant] = []
-                self._key_all_rows[variant].append(row_dict)
+                if variant not in key_all_rows:
+                    key_all_rows[variant] = []
+                key_all_rows[variant].append(row_dict)
                 
                 # For backward compatibility, _key_lookup stores first row
-                if variant not in self._key_lookup:
-                    self._key_lookup[variant] = row_dict
+                if variant not in key_lookup:
+                    key_lookup[variant] = row_dict
         
+        self._key_lookup = key_lookup
+        self._key_all_rows = key_all_rows
         self._key_lookup_built = True
     
     def _generate_ean_variants(self, key: str) -> set:
@@ -321,7 +386,7 @@ class DataSource:
         return None, 0.0, None
 
     
-    def calculate_match_stats(self, base_keys: List[str]) -> Dict[str, Any]:
+    def calculate_match_stats(self, base_keys: Sequence[str]) -> Dict[str, Any]:
         """Calculate how many base keys match this source."""
         matched = 0
         unmatched = 0
@@ -345,7 +410,7 @@ class DataSource:
             'unmatched': unmatched,
             'unmatched_keys': unmatched_keys,
             'total_base': len(base_keys),
-            'match_percent': (matched / len(base_keys) * 100) if base_keys else 0
+            'match_percent': (matched / len(base_keys) * 100) if len(base_keys) else 0
         }
         return self.match_stats
     
@@ -285,6 +285,15 @@ class MappingManager:
         mapping.priority = len(self.mappings)
         self.mappings.append(mapping)
     
+    def add_many(self, mappings: List[ColumnMapping]) -> None:
+        """Add several mappings as a single undo step."""
+        if not mappings:
+            return
+        self._save_undo_state()
+        for mapping in mappings:
+            mapping.priority = len(self.mappings)
+            self.mappings.append(mapping)
+    
     def remove(self, mapping_id: str) -> bool:
         """Remove a mapping by ID."""
         for i, m in enumerate(self.mappings):
@@ -377,6 +386,10 @@ class MappingManager:
         self.mappings = [ColumnMapping.from_dict(d) for d in data]
         self._update_priorities()
     
+    def has_mappings(self) -> bool:
+        """Check whether any mapping is defined."""
+        return bool(self.mappings)
+    
     def __len__(self) -> int:
         return len(self.mappings)
     
@@ -194,6 +194,7 @@ class DataMatcher:
         
         # IMPORTANT: Propagate current key_options to all sources and rebuild their key_lookup
         # This ensures normalization settings (strip_decimal, normalize_paths, etc.) are applied
+        self._report_progress(0, 0, "Budowanie indeksu kluczy...")  # Unknown length phase
         for source in self.data_sources.values():
             source.key_options = self.key_options.copy()
             source.build_key_lookup(force=True)  # Force rebuild with new options
@@ -2,6 +2,7 @@
 Transformer module - data transformation functions.
 """
 import re
+from functools import lru_cache
 from typing import Any, Callable, Dict, Tuple, Optional
 
 
@@ -50,8 +51,9 @@ def apply_transform(value: Any, transform_id: Optional[str]) -> Any:
     return value
 
 
+@lru_cache(maxsize=None)
 def get_transform_names() -> Dict[str, str]:
-    """Get dictionary of transform IDs to display names."""
+    """Get dictionary of transform IDs to display names (shared, do not modify)."""
     return {k: v[0] for k, v in TRANSFORMS.items()}
 
 
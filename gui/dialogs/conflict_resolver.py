@@ -3,14 +3,15 @@ Conflict Resolver Dialog - allows user to pick between multiple matching rows wi
 """
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 
 class ConflictResolverDialog(tk.Toplevel):
     """
     Dialog for resolving matching conflicts (multiple source rows with data for one base key).
     """
     
-    def __init__(self, parent, conflicts: List[Dict[str, Any]], result_df):
+    def __init__(self, parent, conflicts: List[Dict[str, Any]], result_df,
+                 on_resolved: Optional[Callable] = None):
         super().__init__(parent)
         self.title("🔍 Rozwiązywanie konfliktów duplikatów")
         self.geometry("900x600")
@@ -20,9 +21,11 @@ class ConflictResolverDialog(tk.Toplevel):
         self.conflicts = conflicts
         self.result_df = result_df
         self.selections = {}  # conflict_idx -> row_dict
+        self.on_resolved = on_resolved
         
         self._create_widgets()
         self._center_window()
+        self.protocol("WM_DELETE_WINDOW", self._close)
         
     def _create_widgets(self):
         main_frame = ttk.Frame(self, padding=10)
@@ -74,7 +77,7 @@ class ConflictResolverDialog(tk.Toplevel):
         )
         self.apply_btn.pack(side=tk.RIGHT, padx=5)
         
-        ttk.Button(btn_frame, text="Anuluj", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Anuluj", command=self._close).pack(side=tk.RIGHT, padx=5)
         
     def _add_conflict_row(self, idx, conflict):
         key = conflict['key']
@@ -121,7 +124,13 @@ class ConflictResolverDialog(tk.Toplevel):
             target_col = conflict['target_column']
             self.result_df.at[row_idx, target_col] = val
             
+        self._close()
+    
+    def _close(self):
+        """Close the dialog and notify the caller (applied or cancelled)."""
         self.destroy()
+        if self.on_resolved:
+            self.on_resolved()
 
     def _center_window(self):
         self.update_idletasks()
@@ -7,6 +7,7 @@ from tkinter import ttk
 from typing import Optional, Dict, List, Any
 import re
 import difflib
+from functools import lru_cache
 
 from core.mapping import ColumnMapping, WriteMode
 from core.transformer import get_transform_names
@@ -66,8 +67,9 @@ COLUMN_PATTERNS = {
 }
 
 
+@lru_cache(maxsize=4096)
 def normalize_column_name(name: str) -> str:
-    """Normalize column name for matching."""
+    """Normalize column name for matching (cached - column names repeat across calls)."""
     if not name:
         return ""
     # Lowercase, remove extra chars, normalize spaces
@@ -90,10 +92,11 @@ def find_matching_column(source_col: str, target_columns: List[str]) -> Optional
     Uses multi-stage matching: direct -> synonyms -> fuzzy -> word overlap.
     """
     source_norm = normalize_column_name(source_col)
+    target_norms = [normalize_column_name(target) for target in target_columns]
     
     # 1. Direct match (exact or normalized)
-    for target in target_columns:
-        if normalize_column_name(target) == source_norm:
+    for target, target_norm in zip(target_columns, target_norms):
+        if target_norm == source_norm:
             return target
     
     # 2. Pattern-based matching (Synonyms) - check if source belongs to a pattern group
@@ -109,8 +112,7 @@ def find_matching_column(source_col: str, target_columns: List[str]) -> Optional
     
     if source_pattern:
         # Look for target with same pattern
-        for target in target_columns:
-            target_norm = normalize_column_name(target)
+        for target, target_norm in zip(target_columns, target_norms):
             for variant in COLUMN_PATTERNS[source_pattern]:
                 if variant in target_norm or target_norm in variant:
                     return target
@@ -119,8 +121,7 @@ def find_matching_column(source_col: str, target_columns: List[str]) -> Optional
     best_match = None
     best_score = 0.0
     
-    for target in target_columns:
-        target_norm = normalize_column_name(target)
+    for target, target_norm in zip(target_columns, target_norms):
         score = calculate_similarity(source_norm, target_norm)
         
         if score > best_score:
@@ -133,8 +134,8 @@ def find_matching_column(source_col: str, target_columns: List[str]) -> Optional
     
     # 4. Partial word match (fallback) - at least one meaningful word in common
     source_words = set(source_norm.split())
-    for target in target_columns:
-        target_words = set(normalize_column_name(target).split())
+    for target, target_norm in zip(target_columns, target_norms):
+        target_words = set(target_norm.split())
         common = source_words & target_words
         # Accept if any common word has 3+ characters
         meaningful = [w for w in common if len(w) >= 3]
@@ -4,9 +4,15 @@ Main Window - The main application window for DataMatcher Pro.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
+from functools import partial
+
+import numpy as np
+import pandas as pd
 
 # Try to import ttkbootstrap for modern theme
 try:
@@ -20,16 +26,14 @@ from gui.panels.base_file_panel import BaseFilePanel
 from gui.panels.sources_panel import SourcesPanel
 from gui.panels.mappings_panel import MappingsPanel
 from gui.panels.preview_panel import PreviewPanel
-from gui.dialogs.report_viewer import ReportViewerDialog
-from gui.dialogs.mapping_editor import SmartMappingSuggestionDialog, get_all_column_suggestions
 
 from core.data_source import DataSource
-from core.matcher import DataMatcher
+from core.matcher import DataMatcher, ChangeType
 from core.reporter import Reporter
 from core.mapping import ColumnMapping, WriteMode
 from utils.config import Config, Profile, list_profiles
-from utils.file_handlers import save_excel, create_backup
-from utils.session import SessionManager, BatchFilter
+from utils.file_handlers import save_excel, create_backup, get_file_info
+from utils.workers import get_load_pool, shutdown_load_pool, call_in_ui, request_shutdown, shutdown_requested
 
 
 class MainApplication:
@@ -52,6 +56,10 @@ class MainApplication:
         
         self.root.minsize(1200, 800)
         
+        # Button styles resolved once; empty on plain ttk
+        self._btn_success_kwargs = {'bootstyle': 'success'} if HAS_TTKBOOTSTRAP else {}
+        self._btn_primary_kwargs = {'bootstyle': 'primary'} if HAS_TTKBOOTSTRAP else {}
+        
         # Restore window position
         if self.config.window_x and self.config.window_y:
             self.root.geometry(f"+{self.config.window_x}+{self.config.window_y}")
@@ -59,8 +67,44 @@ class MainApplication:
         # Data matcher engine
         self.matcher = DataMatcher()
         
-        # Current result
+        # Key normalization options, updated in place by _refresh_key_options
+        self._key_options: dict = {}
+        
+        # Background workers for I/O that must not block the UI
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        
+        # Pending delayed write of config.json
+        self._config_flush_job = None
+        
+        # Base key list reused across settings toggles: (df, key_col, data_version, keys)
+        self._base_keys_cache = (None, None, None, None)
+        self._base_path: Optional[Path] = None
+        
+        # Fingerprint of the last session written by _save_session (or loaded)
+        self._saved_session_key: Optional[str] = None
+        
+        # Pending debounced settings refresh
+        self._settings_job = None
+        
+        # Key lookup rebuilds still running for _update_match_stats. They and
+        # matcher.execute rebuild the same lookups, so they never overlap:
+        # a preview waits for the rebuild and a rebuild waits for the preview.
+        self._pending_rebuild = None
+        self._preview_future = None
+        self._preview_after_rebuild = False
+        self._deferred_stats: Optional[tuple] = None  # (done_status,) of a rebuild waiting for the preview
+        
+        # Latest progress posted by the worker, painted by _flush_ui
+        self._ui_lock = threading.Lock()
+        self._ui_state = {'status': None, 'progress': None}
+        self._ui_dirty = False
+        self._indet_active = False
+        
+        # Current result and the input fingerprint it was computed from
         self.current_result = None
+        self._last_preview_key: Optional[str] = None
+        self._running_preview_key: Optional[str] = None
+        self._save_after_preview = False
         
         # Setup UI
         self._create_menu()
@@ -95,16 +139,16 @@ class MainApplication:
         profile_menu.add_command(label="Wczytaj profil...", command=self._load_profile, accelerator="Ctrl+L")
         profile_menu.add_separator()
         
-        # Recent profiles submenu
-        self.recent_menu = tk.Menu(profile_menu, tearoff=0)
+        # Recent profiles submenu (filled when opened)
+        self.recent_menu = tk.Menu(profile_menu, tearoff=0, postcommand=self._update_recent_profiles_menu)
         profile_menu.add_cascade(label="Ostatnio używane", menu=self.recent_menu)
-        self._update_recent_profiles_menu()
+        self._recent_paths: List[str] = []
         
         # Tools menu
         tools_menu = tk.Menu(self.menubar, tearoff=0)
         self.menubar.add_cascade(label="Narzędzia", menu=tools_menu)
         
-        tools_menu.add_command(label="Odśwież podgląd", command=self._execute_preview, accelerator="F5")
+        tools_menu.add_command(label="Odśwież podgląd", command=self._refresh_preview, accelerator="F5")
         tools_menu.add_command(label="Cofnij mapowanie", command=self._undo_mapping, accelerator="Ctrl+Z")
         tools_menu.add_separator()
         tools_menu.add_command(label="Filtr przetwarzania...", command=self._show_batch_filter)
@@ -163,19 +207,11 @@ class MainApplication:
         # Fuzzy threshold slider would be nice but for now use 0.85 default
         
         # Theme submenu (if ttkbootstrap available)
+        # (entries are added the first time the menu is opened)
         if HAS_TTKBOOTSTRAP:
-            theme_menu = tk.Menu(tools_menu, tearoff=0)
-            tools_menu.add_cascade(label="Motyw", menu=theme_menu)
-            
-            themes = ['cosmo', 'flatly', 'journal', 'litera', 'lumen', 'minty', 
-                      'pulse', 'sandstone', 'united', 'yeti', 'darkly', 'cyborg', 
-                      'superhero', 'solar', 'vapor']
-            
-            for theme in themes:
-                theme_menu.add_command(
-                    label=theme.capitalize(),
-                    command=lambda t=theme: self._change_theme(t)
-                )
+            self.theme_menu = tk.Menu(tools_menu, tearoff=0, postcommand=self._populate_themes)
+            tools_menu.add_cascade(label="Motyw", menu=self.theme_menu)
+            self._themes_built = False
         
         # Help menu
         help_menu = tk.Menu(self.menubar, tearoff=0)
@@ -183,6 +219,23 @@ class MainApplication:
         
         help_menu.add_command(label="O programie...", command=self._show_about)
     
+    def _populate_themes(self):
+        """Fill the theme submenu on first open."""
+        if self._themes_built:
+            return
+        
+        themes = ['cosmo', 'flatly', 'journal', 'litera', 'lumen', 'minty', 
+                  'pulse', 'sandstone', 'united', 'yeti', 'darkly', 'cyborg', 
+                  'superhero', 'solar', 'vapor']
+        
+        self.theme_menu.delete(0, tk.END)
+        for theme in themes:
+            self.theme_menu.add_command(
+                label=theme.capitalize(),
+                command=lambda t=theme: self._change_theme(t)
+            )
+        self._themes_built = True
+    
     def _create_main_layout(self):
         """Create main layout with panels."""
         # Main container
@@ -214,17 +267,15 @@ class MainApplication:
         self.paned = ttk.PanedWindow(self.main_frame, orient=tk.VERTICAL)
         self.paned.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        # Middle section (mappings) - in paned window
-        self.mappings_panel = MappingsPanel(
-            self.paned,
-            on_mapping_changed=self._on_mapping_changed
-        )
-        self.paned.add(self.mappings_panel, weight=1)
+        # Middle section (mappings) - placeholder, real panel built lazily
+        self.mappings_frame = ttk.Frame(self.paned)
+        self.paned.add(self.mappings_frame, weight=1)
+        self.mappings_panel: Optional[MappingsPanel] = None
         
-        # Bottom section (preview) - in paned window, gets more weight
-        self.preview_panel = PreviewPanel(self.paned)
-        self.paned.add(self.preview_panel, weight=3)
-        self.preview_panel.set_refresh_callback(self._execute_preview)
+        # Bottom section (preview) - placeholder, gets more weight
+        self.preview_frame = ttk.Frame(self.paned)
+        self.paned.add(self.preview_frame, weight=3)
+        self.preview_panel: Optional[PreviewPanel] = None
         
         # Action buttons
         btn_frame = ttk.Frame(self.main_frame)
@@ -243,39 +294,42 @@ class MainApplication:
         ).pack(side=tk.RIGHT, padx=(10, 0))
         
         # Save button (initially disabled)
-        if HAS_TTKBOOTSTRAP:
-            self.save_btn = ttk.Button(
-                btn_frame, text="💾 ZAPISZ WYNIK",
-                command=self._save_result,
-                width=20,
-                bootstyle="success",
-                state='disabled'
-            )
-        else:
-            self.save_btn = ttk.Button(
-                btn_frame, text="💾 ZAPISZ WYNIK",
-                command=self._save_result,
-                width=20,
-                state='disabled'
-            )
+        self.save_btn = ttk.Button(
+            btn_frame, text="💾 ZAPISZ WYNIK",
+            command=self._save_result,
+            width=20,
+            state='disabled',
+            **self._btn_success_kwargs
+        )
         self.save_btn.pack(side=tk.RIGHT, padx=(10, 0))
         
         # Execute button
-        if HAS_TTKBOOTSTRAP:
-            self.execute_btn = ttk.Button(
-                btn_frame, text="▶ WYKONAJ (PODGLĄD)",
-                command=self._execute_preview,
-                width=25,
-                bootstyle="primary"
-            )
-        else:
-            self.execute_btn = ttk.Button(
-                btn_frame, text="▶ WYKONAJ (PODGLĄD)",
-                command=self._execute_preview,
-                width=25
-            )
+        self.execute_btn = ttk.Button(
+            btn_frame, text="▶ WYKONAJ (PODGLĄD)",
+            command=self._execute_preview,
+            width=25,
+            **self._btn_primary_kwargs
+        )
         self.execute_btn.pack(side=tk.RIGHT)
     
+    def _ensure_mappings_panel(self) -> MappingsPanel:
+        """Create the mappings panel on first use."""
+        if self.mappings_panel is None:
+            self.mappings_panel = MappingsPanel(
+                self.mappings_frame,
+                on_mapping_changed=self._on_mapping_changed
+            )
+            self.mappings_panel.pack(fill=tk.BOTH, expand=True)
+        return self.mappings_panel
+    
+    def _ensure_preview_panel(self) -> PreviewPanel:
+        """Create the preview panel on first use."""
+        if self.preview_panel is None:
+            self.preview_panel = PreviewPanel(self.preview_frame)
+            self.preview_panel.pack(fill=tk.BOTH, expand=True)
+            self.preview_panel.set_refresh_callback(self._refresh_preview)
+        return self.preview_panel
+    
     def _create_status_bar(self):
         """Create status bar at bottom."""
         self.status_frame = ttk.Frame(self.root)
@@ -296,6 +350,10 @@ class MainApplication:
             length=200
         )
         self.progress_bar.pack(side=tk.RIGHT, padx=10, pady=5)
+        
+        # Short-lived confirmations shown next to the status (see _toast)
+        self.toast_label = ttk.Label(self.status_frame, padding=(10, 5), foreground='green')
+        self._toast_job = None
     
     def _bind_shortcuts(self):
         """Bind keyboard shortcuts."""
@@ -305,25 +363,104 @@ class MainApplication:
         self.root.bind('<Control-S>', lambda e: self._save_profile())
         self.root.bind('<Control-l>', lambda e: self._load_profile())
         self.root.bind('<Control-z>', lambda e: self._undo_mapping())
-        self.root.bind('<F5>', lambda e: self._execute_preview())
+        self.root.bind('<F5>', lambda e: self._refresh_preview())
     
     def _set_status(self, message: str):
         """Update status bar message."""
         self.status_label.config(text=message)
-        self.root.update_idletasks()
+    
+    def _toast(self, message: str, ms: int = 2000):
+        """Show a non-blocking confirmation in the status bar for a moment."""
+        if self._toast_job is not None:
+            self.root.after_cancel(self._toast_job)
+        self.toast_label.config(text=message)
+        self.toast_label.pack(side=tk.LEFT)
+        self._toast_job = self.root.after(ms, self._hide_toast)
+    
+    def _hide_toast(self):
+        """Remove the confirmation shown by _toast."""
+        self._toast_job = None
+        self.toast_label.pack_forget()
     
     def _set_progress(self, value: float):
         """Update progress bar."""
         self.progress_var.set(value)
-        self.root.update_idletasks()
+    
+    def _start_indeterminate(self):
+        """Animate the progress bar for phases of unknown length."""
+        if not self._indet_active:
+            self._indet_active = True
+            self.progress_bar.config(mode='indeterminate')
+            self.progress_bar.start(50)
+    
+    def _stop_indeterminate(self):
+        """Return the progress bar to determinate mode."""
+        if self._indet_active:
+            self._indet_active = False
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate')
+    
+    def _post_progress(self, percent: float, message: str):
+        """Store latest progress from a worker thread (painted by _flush_ui).
+        
+        A negative percent marks a phase of unknown length. At most one
+        flush is queued at a time, however often the worker reports.
+        """
+        with self._ui_lock:
+            self._ui_state['progress'] = percent
+            self._ui_state['status'] = message
+            if self._ui_dirty:
+                return
+            self._ui_dirty = True
+        self.root.after_idle(self._flush_ui)
+    
+    def _flush_ui(self):
+        """Paint the latest posted progress."""
+        with self._ui_lock:
+            status = self._ui_state['status']
+            progress = self._ui_state['progress']
+            self._ui_state['status'] = None
+            self._ui_state['progress'] = None
+            self._ui_dirty = False
+        
+        if progress is not None:
+            if progress < 0:
+                self._start_indeterminate()
+            else:
+                self._stop_indeterminate()
+                self._set_progress(progress)
+        if status is not None:
+            self._set_status(status)
+    
+    def _clear_ui_progress(self):
+        """Drop worker progress that has not been painted yet."""
+        self._stop_indeterminate()
+        with self._ui_lock:
+            self._ui_state['status'] = None
+            self._ui_state['progress'] = None
+    
+    def _schedule_config_flush(self):
+        """Write dirty config to disk a few seconds after the last change."""
+        if self._config_flush_job is None:
+            self._config_flush_job = self.root.after(5000, self._flush_config)
+    
+    def _flush_config(self):
+        """Save config if it has unsaved in-memory changes."""
+        self._config_flush_job = None
+        if self.config.dirty:
+            self.config.save()
     
     # Event handlers
     def _on_base_loaded(self, source: DataSource):
         """Handle base file loaded."""
         self.matcher.set_base_source(source)
+        self._base_keys_cache = (None, None, None, None)
+        self._base_path = Path(source.filepath)
+        self._ensure_mappings_panel()
         self._update_mappings_options()
         self._set_status(f"Wczytano: {source.filename}")
         self.config.add_recent_base_file(source.filepath)
+        self._schedule_config_flush()
         
         # Check for profile match
         self._check_profile_match(source.filename)
@@ -341,6 +478,7 @@ class MainApplication:
     
     def _on_base_key_changed(self, source: DataSource):
         """Handle base key column changed."""
+        self._base_keys_cache = (None, None, None, None)
         self._update_match_stats()
         self._set_status("Zmieniono klucz - kliknij 'Sugestie' lub 'Generuj podgląd'")
     
@@ -351,11 +489,14 @@ class MainApplication:
         self._update_match_stats()
         self._set_status(f"Dodano źródło: {source.filename} - Kliknij 'Sugestie' aby dodać mapowania")
         self.config.add_recent_source_file(source.filepath)
+        self._schedule_config_flush()
         # User will click "Sugestie" manually when ready
     
     def _auto_suggest_mappings(self, source: DataSource):
         """Automatically suggest mappings for new source."""
-        target_cols = self.matcher.base_source.get_columns()
+        from gui.dialogs.mapping_editor import SmartMappingSuggestionDialog, get_all_column_suggestions
+        
+        target_cols = list(self.matcher.base_source.get_columns())
         source_cols = source.get_columns()
         
         suggestions = get_all_column_suggestions(source_cols, target_cols)
@@ -373,8 +514,8 @@ class MainApplication:
             )
             
             if dialog.result:
-                for sug in dialog.result:
-                    mapping = ColumnMapping(
+                self.matcher.mapping_manager.add_many([
+                    ColumnMapping(
                         source_id=source.id,
                         source_name=source.filename,
                         source_column=sug['source_column'],
@@ -382,9 +523,10 @@ class MainApplication:
                         target_is_new=sug['target_is_new'],
                         write_mode=WriteMode.OVERWRITE
                     )
-                    self.matcher.mapping_manager.add(mapping)
+                    for sug in dialog.result
+                ])
                 
-                self.mappings_panel._refresh_tree()
+                self._ensure_mappings_panel()._refresh_tree()
                 self._execute_preview()
     
     def _on_source_removed(self, source: DataSource):
@@ -395,6 +537,7 @@ class MainApplication:
     
     def _on_source_key_changed(self, source: DataSource):
         """Handle source key changed."""
+        self._last_preview_key = None  # Key fixes may have edited the data in place
         self._update_match_stats()
         self._execute_preview()
     
@@ -407,132 +550,246 @@ class MainApplication:
     
     def _update_mappings_options(self):
         """Update available options in mappings panel."""
-        sources = {s.id: s.filename for s in self.matcher.data_sources.values()}
-        source_columns = {s.id: s.get_columns() for s in self.matcher.data_sources.values()}
+        sources, source_columns = {}, {}
+        for sid, s in self.matcher.data_sources.items():
+            sources[sid] = s.filename
+            source_columns[sid] = s.get_columns()  # cached on the DataSource
         
-        self.mappings_panel.set_sources(sources, source_columns)
+        mappings_panel = self._ensure_mappings_panel()
+        mappings_panel.set_sources(sources, source_columns)
         
         if self.matcher.base_source:
-            self.mappings_panel.set_target_columns(self.matcher.base_source.get_columns())
+            mappings_panel.set_target_columns(self.matcher.base_source.get_columns())
     
     def _on_settings_changed(self):
-        """Handle settings change (checkboxes)."""
+        """Handle settings change (checkboxes) - debounced."""
+        if self._settings_job is not None:
+            self.root.after_cancel(self._settings_job)
+        self._settings_job = self.root.after(300, self._apply_settings)
+    
+    def _apply_settings(self):
+        """Apply settings after the user stopped toggling checkboxes."""
+        self._settings_job = None
         self._set_status("Aktualizowanie ustawień...")
-        self.root.update_idletasks()
-        
-        # Update stats immediately
-        self._update_match_stats()
         
+        # Update stats (the status is set once the rebuild has finished)
         # If we have mappings, we might want to invalidate preview or auto-refresh?
         # For now, just update stats as that's what the user sees first.
-        self._set_status("Zaktualizowano ustawienia. Odśwież podgląd (F5).")
+        self._update_match_stats("Zaktualizowano ustawienia. Odśwież podgląd (F5).")
     
-    def _update_match_stats(self):
-        """Update match statistics for all sources."""
+    def _update_match_stats(self, done_status: Optional[str] = None):
+        """Update match statistics for all sources (done_status is shown when finished)."""
         if not self.matcher.base_source or not self.matcher.base_source.key_column:
             return
         
+        # A running preview rebuilds the same lookups - refresh stats after it
+        if self._preview_future is not None:
+            self._deferred_stats = (done_status,)
+            return
+        
         # Get current key_options from UI and propagate to sources
-        key_options = {
-            'case_insensitive': self.case_insensitive_var.get(),
-            'strip_leading_zeros': self.strip_zeros_var.get(),
-            'strip_decimal': self.strip_decimal_var.get(),
-            'normalize_paths': self.normalize_paths_var.get()
-        }
+        key_options = self._refresh_key_options()
         
         # Update each source with current options and rebuild key_lookup
+        # on the worker pool - sources are independent
+        futures = []
         for source in self.sources_panel.get_sources().values():
-            source.key_options = key_options.copy()
-            source.build_key_lookup(force=True)
+            source.key_options = dict(key_options)  # own copy; the UI dict is updated in place
+            futures.append(self._executor.submit(source.build_key_lookup, force=True))
         
-        base_keys = list(self.matcher.base_source.dataframe[
-            self.matcher.base_source.key_column
-        ].dropna().astype(str))
+        self._pending_rebuild = futures
+        self.root.after(50, self._after_rebuild, futures, self._get_base_keys(), done_status)
+    
+    def _after_rebuild(self, futures, base_keys: np.ndarray, done_status: Optional[str] = None):
+        """Refresh match stats once all key_lookup rebuilds have finished."""
+        if futures is not self._pending_rebuild:
+            return  # Superseded by a newer rebuild
         
-        self.sources_panel.update_match_stats(base_keys)
+        if not all(f.done() for f in futures):
+            self.root.after(50, self._after_rebuild, futures, base_keys, done_status)
+            return
+        
+        self._pending_rebuild = None
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            # Stats from a partly rebuilt index would be wrong - keep the old ones
+            self._set_status(f"Błąd przebudowy indeksu kluczy: {errors[0]}")
+        else:
+            self.sources_panel.update_match_stats(base_keys)
+            if done_status:
+                self._set_status(done_status)
+        
+        # A preview requested during the rebuild
+        if self._preview_after_rebuild:
+            self._preview_after_rebuild = False
+            self._execute_preview()
+    
+    def _get_base_keys(self) -> np.ndarray:
+        """Base key column as strings, cached per dataframe, key column and data version."""
+        base = self.matcher.base_source
+        df = base.dataframe
+        key_col = base.key_column
+        
+        # The data version changes on sheet switches and in-place key rewrites
+        cached_df, cached_col, cached_version, cached_keys = self._base_keys_cache
+        if cached_df is df and cached_col == key_col and cached_version == base.data_version:
+            return cached_keys
+        
+        col = df[key_col].dropna()
+        if pd.api.types.infer_dtype(col, skipna=True) != 'string':
+            col = col.astype(str)  # Only copy when there are non-str values
+        base_keys = col.to_numpy(dtype=object, copy=False)
+        self._base_keys_cache = (df, key_col, base.data_version, base_keys)
+        return base_keys
+    
+    def _refresh_preview(self):
+        """Re-run the preview on explicit request (F5), even if inputs look unchanged."""
+        self._last_preview_key = None
+        self._execute_preview()
     
     def _execute_preview(self):
         """Execute mappings and update preview (without saving)."""
         try:
             if not self._validate_ready():
+                self._save_after_preview = False
+                return
+            
+            # Nothing that affects the result changed - keep the current preview
+            preview_key = self._preview_key()
+            if self.current_result is not None and preview_key == self._last_preview_key:
+                self._set_status("Podgląd aktualny - brak zmian od ostatniego wykonania")
+                self._set_progress(100)
+                return
+            
+            # Match stats are rebuilding the key lookups - run once they finish
+            if self._pending_rebuild is not None:
+                self._preview_after_rebuild = True
+                self._set_status("Przebudowa indeksu kluczy - podgląd uruchomi się po jej zakończeniu...")
                 return
             
+            preview_panel = self._ensure_preview_panel()
+            
             # Disable buttons and show loading state
             self.execute_btn.config(state='disabled', text="⏳ Przetwarzanie...")
             self.save_btn.config(state='disabled')
-            self.preview_panel.refresh_btn.config(state='disabled', text="⏳ Przetwarzanie...")
+            preview_panel.refresh_btn.config(state='disabled', text="⏳ Przetwarzanie...")
             
             self._set_status("Przetwarzanie... Proszę czekać")
             self._set_progress(0)
-            self.root.update_idletasks()  # Force immediate UI update
             
-            # Apply current key options
-            self.matcher.key_options = {
-                'case_insensitive': self.case_insensitive_var.get(),
-                'strip_leading_zeros': self.strip_zeros_var.get(),
-                'strip_decimal': self.strip_decimal_var.get(),
-                'normalize_paths': self.normalize_paths_var.get(),
-                'fuzzy_threshold': 0.85 if self.fuzzy_matching_var.get() else 1.0  # Better than VLOOKUP!
-            }
+            # Apply current key options (snapshot - the worker reads it per row
+            # while the UI may refresh the shared dict)
+            self.matcher.key_options = dict(self._refresh_key_options())
             
             # Apply batch filter if set
             batch_filter = getattr(self, 'batch_filter', None)
             self.matcher.batch_filter = batch_filter
+            self._running_preview_key = preview_key
             
-            # Set up progress callback
+            # Set up progress callback (worker only posts, _flush_ui paints)
             def progress_callback(current, total, message):
-                percent = (current / total * 100) if total > 0 else 0
-                
-                def update_ui():
-                    self._set_progress(percent)
-                    self._set_status(f"Przetwarzanie: {current:,}/{total:,} wierszy ({percent:.0f}%)")
-                
-                # Schedule UI update on main thread
-                self.root.after(0, update_ui)
+                if shutdown_requested():
+                    raise InterruptedError("Operation cancelled")
+                if total <= 0:
+                    self._post_progress(-1, message)
+                    return
+                percent = current / total * 100
+                self._post_progress(
+                    percent,
+                    f"Przetwarzanie: {current:,}/{total:,} wierszy ({percent:.0f}%)"
+                )
             
             self.matcher.set_progress_callback(progress_callback)
+            self._clear_ui_progress()
             
-            # Run in thread to prevent freezing
-            def execute_thread():
-                try:
-                    result = self.matcher.execute()
-                    
-                    # Schedule UI update on main thread
-                    self.root.after(0, lambda: self._on_execute_complete(result, batch_filter))
-                    
-                except Exception as e:
-                    self.root.after(0, lambda: self._on_execute_error(str(e)))
-            
-            import threading
-            thread = threading.Thread(target=execute_thread, daemon=True)
-            thread.start()
+            # Run on the worker pool; the result is dispatched on the main thread
+            future = self._executor.submit(self.matcher.execute)
+            self._preview_future = future
+            future.add_done_callback(
+                lambda f: call_in_ui(self.root, self._dispatch_result, f, batch_filter)
+            )
             
         except Exception as e:
             import traceback
             traceback.print_exc()
             messagebox.showerror("Błąd krytyczny", f"Nie można uruchomić podglądu:\n{e}")
+            self._save_after_preview = False
             self._reset_buttons()
             self._set_status("Błąd uruchamiania")
 
+    def _dispatch_result(self, future, batch_filter):
+        """Route a finished matcher.execute() future to the right handler."""
+        self._preview_future = None
+        error = future.exception()
+        if error is not None:
+            self._on_execute_error(str(error))
+        else:
+            self._on_execute_complete(future.result(), batch_filter)
+        
+        # Match stats requested while the preview was rebuilding the lookups
+        if self._deferred_stats is not None:
+            deferred, self._deferred_stats = self._deferred_stats, None
+            self._update_match_stats(*deferred)
+    
+    def _refresh_key_options(self) -> dict:
+        """Update the shared key options dict in place from the UI and return it.
+        
+        The dict is handed out by reference - consumers must not mutate it.
+        """
+        self._key_options.update(
+            case_insensitive=self.case_insensitive_var.get(),
+            strip_leading_zeros=self.strip_zeros_var.get(),
+            strip_decimal=self.strip_decimal_var.get(),
+            normalize_paths=self.normalize_paths_var.get(),
+            fuzzy_threshold=0.85 if self.fuzzy_matching_var.get() else 1.0  # Better than VLOOKUP!
+        )
+        return self._key_options
+    
+    def _preview_key(self) -> str:
+        """Fingerprint of everything that affects matcher.execute()."""
+        base = self.matcher.base_source
+        batch_filter = getattr(self, 'batch_filter', None)
+        return repr((
+            (base.id, base.sheet, base.key_column, base.data_version) if base else None,
+            sorted(
+                (s.id, s.sheet, s.key_column, s.data_version)
+                for s in self.matcher.data_sources.values()
+            ),
+            self.matcher.mapping_manager.to_list(),
+            sorted(self._refresh_key_options().items()),
+            batch_filter.to_dict() if batch_filter else None
+        ))
+    
     def _reset_buttons(self):
         """Reset buttons to normal state."""
         self.execute_btn.config(state='normal', text="▶ WYKONAJ (PODGLĄD)")
         self.save_btn.config(state='normal')
-        self.preview_panel.refresh_btn.config(state='normal', text="▶ GENERUJ PODGLĄD (F5)")
+        if self.preview_panel is not None:
+            self.preview_panel.refresh_btn.config(state='normal', text="▶ GENERUJ PODGLĄD (F5)")
 
     def _on_execute_complete(self, result, batch_filter):
         """Called when execution completes successfully."""
+        self._clear_ui_progress()
         self.current_result = result
+        self._last_preview_key = self._running_preview_key
         
         # Check for duplicate conflicts - SMART RESOLVER
         if hasattr(self.matcher, '_duplicate_conflicts') and self.matcher._duplicate_conflicts:
             from gui.dialogs.conflict_resolver import ConflictResolverDialog
-            dialog = ConflictResolverDialog(self.root, self.matcher._duplicate_conflicts, result.result_df)
-            self.root.wait_window(dialog)
-            # After dialog, the result.result_df is updated
+            # The dialog updates result.result_df; the preview is shown once it closes
+            ConflictResolverDialog(
+                self.root, self.matcher._duplicate_conflicts, result.result_df,
+                on_resolved=lambda: self._finish_execute_complete(result, batch_filter)
+            )
+            return
         
-        self.preview_panel.set_preview_data(result.result_df, result.changes)
-        self.preview_panel.update_stats(result.stats)
+        self._finish_execute_complete(result, batch_filter)
+    
+    def _finish_execute_complete(self, result, batch_filter):
+        """Show a finished (and conflict-resolved) result in the preview."""
+        preview_panel = self._ensure_preview_panel()
+        preview_panel.set_preview_data(result.result_df, result.changes)
+        preview_panel.update_stats(result.stats)
         
         # Build status message
         filter_info = ""
@@ -547,9 +804,15 @@ class MainApplication:
         self._set_status(f"Podgląd gotowy - sprawdź wyniki i zapisz{filter_info}{conflict_info}")
         self._set_progress(100)
         self._reset_buttons()
+        
+        if self._save_after_preview:
+            self._save_after_preview = False
+            self._save_result()
     
     def _on_execute_error(self, error_message):
         """Called when execution fails."""
+        self._clear_ui_progress()
+        self._save_after_preview = False
         self._set_status(f"Błąd: {error_message}")
         self._set_progress(0)
         self._reset_buttons()
@@ -561,8 +824,15 @@ class MainApplication:
             messagebox.showwarning("Brak danych", "Najpierw wykonaj podgląd.")
             return
         
+        # Reuse the preview result unless inputs changed since it was computed
+        if self._preview_key() != self._last_preview_key:
+            self._save_after_preview = True
+            self._set_status("Podgląd nieaktualny - odświeżanie przed zapisem...")
+            self._execute_preview()
+            return
+        
         # Ask for output file
-        default_name = Path(self.matcher.base_source.filepath).stem + self.config.output_suffix + ".xlsx"
+        default_name = self._base_path.stem + self.config.output_suffix + ".xlsx"
         
         filepath = filedialog.asksaveasfilename(
             title="Zapisz wynik jako",
@@ -577,35 +847,69 @@ class MainApplication:
         if not filepath:
             return
         
-        try:
-            self._set_status("Zapisywanie...")
-            self._set_progress(0)
-            
-            # Create backup if enabled
-            if self.backup_var.get() and Path(self.matcher.base_source.filepath).exists():
-                backup_path = create_backup(self.matcher.base_source.filepath)
-                self._set_status(f"Utworzono backup: {Path(backup_path).name}")
-            
-            # Save
-            save_excel(self.current_result.result_df, filepath)
-            
-            self._set_progress(100)
-            self._set_status(f"Zapisano: {Path(filepath).name}")
-            
-            # Show report
-            self._show_execution_report(self.current_result, filepath)
-            
-        except Exception as e:
-            self._set_status(f"Błąd zapisu: {e}")
-            messagebox.showerror("Błąd", f"Nie można zapisać:\n{e}")
+        # Writing Excel reports no progress, so just keep the bar moving
+        self._set_status("Zapisywanie...")
+        self._start_indeterminate()
+        self.save_btn.config(state='disabled')
+        
+        result = self.current_result
+        base_path = self._base_path
+        make_backup = self.backup_var.get() and base_path.exists()
+        # Backing up the file we are about to overwrite must finish first
+        overwrites_base = make_backup and Path(filepath).resolve() == base_path.resolve()
+        
+        def save_task():
+            backup_path = create_backup(base_path) if overwrites_base else None
+            save_excel(result.result_df, filepath)
+            return backup_path
+        
+        # Copy the base file while the result is being written
+        futures = [self._executor.submit(save_task)]
+        if make_backup and not overwrites_base:
+            futures.append(self._executor.submit(create_backup, base_path))
+        reported = []
+        
+        def finish():
+            if reported or not all(f.done() for f in futures):
+                return
+            reported.append(True)
+            errors = [f.exception() for f in futures if f.exception()]
+            if errors:
+                self._on_save_error(str(errors[0]))
+                return
+            # The last future yields the backup path (or None)
+            self._on_save_complete(result, filepath, futures[-1].result())
+        
+        for future in futures:
+            future.add_done_callback(lambda f: call_in_ui(self.root, finish))
+    
+    def _on_save_complete(self, result, filepath: str, backup_path: Optional[str]):
+        """Called when the result file (and backup) have been written."""
+        self.save_btn.config(state='normal')
+        self._stop_indeterminate()
+        self._set_progress(100)
+        backup_info = f" (backup: {Path(backup_path).name})" if backup_path else ""
+        self._set_status(f"Zapisano: {Path(filepath).name}{backup_info}")
+        
+        # Show report
+        self._show_execution_report(result, filepath)
+    
+    def _on_save_error(self, error_message: str):
+        """Called when saving fails."""
+        self.save_btn.config(state='normal')
+        self._stop_indeterminate()
+        self._set_progress(0)
+        self._set_status(f"Błąd zapisu: {error_message}")
+        messagebox.showerror("Błąd", f"Nie można zapisać:\n{error_message}")
     
     def _validate_ready(self) -> bool:
         """Check if ready to execute."""
-        if not self.matcher.base_source:
+        base_source = self.matcher.base_source
+        if not base_source:
             messagebox.showwarning("Brak pliku bazowego", "Wczytaj najpierw plik bazowy.")
             return False
             
-        if not self.matcher.base_source.key_column:
+        if not base_source.key_column:
             messagebox.showwarning("Brak klucza", "Wybierz kolumnę klucza dla pliku bazowego.")
             return False
             
@@ -613,7 +917,7 @@ class MainApplication:
             messagebox.showwarning("Brak źródeł", "Dodaj przynajmniej jedno źródło danych.")
             return False
             
-        if not self.matcher.mapping_manager.mappings:
+        if not self.matcher.mapping_manager.has_mappings():
             messagebox.showwarning("Brak mapowań", "Zdefiniuj przynajmniej jedno mapowanie kolumn.")
             return False
             
@@ -630,6 +934,8 @@ class MainApplication:
     
     def _show_execution_report(self, result, output_filepath: str):
         """Show execution report dialog."""
+        from gui.dialogs.report_viewer import ReportViewerDialog
+        
         reporter = Reporter(result)
         
         # Gather info
@@ -642,17 +948,20 @@ class MainApplication:
                 'total_base': s.match_stats.get('total_base', 0)
             })
         
+        # Count written cells per mapping in a single pass over the changes
+        written = {ChangeType.NEW, ChangeType.CHANGED}
+        changed_counts = Counter(
+            c.mapping_id for c in result.changes
+            if c.change_type in written
+        )
+        
         mappings_info = []
         for m in self.matcher.mapping_manager.mappings:
-            # Count changes for this mapping
-            changes = sum(1 for c in result.changes 
-                          if c.mapping_id == m.id and 
-                          c.change_type.value in ('new', 'changed'))
             mappings_info.append({
                 'source_column': m.source_column,
                 'target_column': m.target_column,
                 'write_mode': m.write_mode.value,
-                'cells_changed': changes
+                'cells_changed': changed_counts.get(m.id, 0)
             })
         
         report_text = reporter.generate_summary(
@@ -707,9 +1016,9 @@ class MainApplication:
         
         profile.save(str(filepath))
         self.config.add_recent_profile(str(filepath))
-        self._update_recent_profiles_menu()
+        self._schedule_config_flush()
         
-        messagebox.showinfo("Zapisano", f"Profil zapisany:\n{filepath}")
+        self._toast(f"✔ Profil zapisany: {filepath}")
     
     def _load_profile(self):
         """Load profile from file."""
@@ -741,36 +1050,48 @@ class MainApplication:
             self.strip_zeros_var.set(profile.base_key_options.get('strip_leading_zeros', False))
             
             # Load mappings
-            self.mappings_panel.load_mappings(profile.mappings)
+            self._ensure_mappings_panel().load_mappings(profile.mappings)
             
             self.config.add_recent_profile(filepath)
-            self._update_recent_profiles_menu()
+            self._schedule_config_flush()
             
             self._set_status(f"Wczytano profil: {profile.profile_name}")
             
-            messagebox.showinfo(
-                "Profil wczytany",
-                f"Wczytano profil: {profile.profile_name}\n\n"
-                "Uwaga: Wczytaj pliki źródłowe ręcznie."
-            )
+            self._toast("✔ Profil wczytany - wczytaj pliki źródłowe ręcznie", ms=4000)
             
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie można wczytać profilu:\n{e}")
     
     def _update_recent_profiles_menu(self):
-        """Update recent profiles submenu."""
-        self.recent_menu.delete(0, tk.END)
+        """Update recent profiles submenu (runs when the menu is opened)."""
+        # Nothing to do when the list is unchanged since the menu was last opened
+        paths = self.config.recent_profiles[:10]
+        if paths == self._recent_paths:
+            return
         
-        for filepath in self.config.recent_profiles[:10]:
+        # Relabel existing entries in place; each entry loads the path at its index
+        size = len(self._recent_paths)
+        for i, filepath in enumerate(paths):
             name = Path(filepath).stem
-            self.recent_menu.add_command(
-                label=name,
-                command=lambda p=filepath: self._load_profile_from_path(p)
-            )
+            if i < size:
+                self.recent_menu.entryconfigure(i, label=name)
+            else:
+                self.recent_menu.add_command(
+                    label=name,
+                    command=partial(self._load_recent_profile, i)
+                )
+        if len(paths) < size:
+            self.recent_menu.delete(len(paths), size - 1)
+        self._recent_paths = list(paths)
+    
+    def _load_recent_profile(self, index: int):
+        """Load the profile shown at the given position of the recent menu."""
+        self._load_profile_from_path(self._recent_paths[index])
     
     def _undo_mapping(self):
         """Undo last mapping change."""
-        self.mappings_panel._undo()
+        if self.mappings_panel is not None:
+            self.mappings_panel._undo()
     
     def _new_session(self):
         """Start a new session."""
@@ -781,9 +1102,13 @@ class MainApplication:
             self.matcher.clear()
             self.base_panel.reset()
             self.sources_panel.reset()
-            self.mappings_panel.reset()
-            self.preview_panel.clear()
+            if self.mappings_panel is not None:
+                self.mappings_panel.reset()
+            if self.preview_panel is not None:
+                self.preview_panel.clear()
             self.current_result = None
+            self._last_preview_key = None
+            self._base_path = None
             self.save_btn.config(state='disabled')
             self._set_status("Nowa sesja")
     
@@ -807,12 +1132,33 @@ class MainApplication:
     
     def _save_session(self, silent: bool = False):
         """Save current session state."""
+        from utils.session import SessionManager
+        
         if not self.matcher.base_source:
             if not silent:
                 messagebox.showinfo("Brak danych", "Brak danych do zapisania.")
             return
         
-        session_data = {
+        session_data = self._session_data()
+        
+        # Nothing changed since the last save - skip the write
+        session_key = repr(session_data)
+        if session_key == self._saved_session_key:
+            if not silent:
+                self._toast("✔ Sesja została zapisana")
+            return
+        
+        if SessionManager.save_session(session_data):
+            self._saved_session_key = session_key
+            if not silent:
+                self._toast("✔ Sesja została zapisana")
+        else:
+            if not silent:
+                messagebox.showerror("Błąd", "Nie udało się zapisać sesji.")
+    
+    def _session_data(self) -> dict:
+        """Current session state as saved by _save_session."""
+        return {
             'base_file': self.matcher.base_source.filepath,
             'base_key_column': self.matcher.base_source.key_column,
             'sources': [
@@ -824,58 +1170,101 @@ class MainApplication:
             'mappings': self.matcher.mapping_manager.to_list(),
             'key_options': self.matcher.key_options
         }
-        
-        if SessionManager.save_session(session_data):
-            if not silent:
-                messagebox.showinfo("Zapisano", "Sesja została zapisana.")
-        else:
-            if not silent:
-                messagebox.showerror("Błąd", "Nie udało się zapisać sesji.")
     
     def _load_last_session(self):
         """Load last saved session."""
+        from utils.session import SessionManager
+        
         session = SessionManager.load_session()
         
         if not session:
             messagebox.showinfo("Brak sesji", "Nie znaleziono zapisanej sesji.")
             return
         
+        base_path = session.get('base_file')
+        base_key = session.get('base_key_column', '')
+        if not (base_path and Path(base_path).exists()):
+            base_path = None
+        src_entries = [
+            s for s in session.get('sources', [])
+            if s.get('filepath') and Path(s['filepath']).exists()
+        ]
+        
+        def load_base():
+            source = DataSource(filepath=base_path)
+            sheets = source.load(keep_workbook=True)
+            if base_key:
+                source.set_key_column(base_key)
+            return source, sheets, get_file_info(base_path)
+        
+        def load_source(src_data):
+            source = DataSource(filepath=src_data['filepath'])
+            source.load()
+            if src_data.get('key_column'):
+                source.set_key_column(src_data['key_column'])
+            return source
+        
+        self._set_status("Wczytywanie sesji...")
+        self._start_indeterminate()
+        
+        # Read all session files in parallel; they are applied in order once all finish
+        loader = get_load_pool()
+        base_future = loader.submit(load_base) if base_path else None
+        source_futures = [loader.submit(load_source, s) for s in src_entries]
+        
+        futures = source_futures + ([base_future] if base_future else [])
+        reported = []
+        
+        def finish():
+            if reported or not all(f.done() for f in futures):
+                return
+            reported.append(True)
+            self._apply_loaded_session(session, base_future, source_futures)
+        
+        if not futures:
+            finish()
+        for future in futures:
+            future.add_done_callback(lambda f: call_in_ui(self.root, finish))
+    
+    def _apply_loaded_session(self, session: dict, base_future, source_futures: list):
+        """Show files loaded by _load_last_session and restore mappings/options."""
+        self._stop_indeterminate()
+        errors = [str(f.exception()) for f in source_futures if f.exception()]
         try:
-            # Load base file
-            base_path = session.get('base_file')
-            if base_path and Path(base_path).exists():
-                base_source = DataSource.from_file(
-                    base_path,
-                    key_column=session.get('base_key_column', '')
-                )
-                self.base_panel.set_source(base_source)
-                self._on_base_loaded(base_source)
+            if base_future is not None:
+                if base_future.exception():
+                    errors.insert(0, str(base_future.exception()))
+                else:
+                    self.base_panel.set_source(*base_future.result())
             
-            # Load sources
-            for src_data in session.get('sources', []):
-                src_path = src_data.get('filepath')
-                if src_path and Path(src_path).exists():
-                    source = DataSource.from_file(
-                        src_path,
-                        key_column=src_data.get('key_column', '')
-                    )
-                    self.sources_panel.add_source(source)
-                    self._on_source_added(source)
+            for future in source_futures:
+                if not future.exception():
+                    self.sources_panel.add_source(future.result())
             
             # Load mappings
-            self.mappings_panel.load_mappings(session.get('mappings', []))
+            self._ensure_mappings_panel().load_mappings(session.get('mappings', []))
             
             # Load key options
             self.matcher.key_options = session.get('key_options', {})
             
-            self._set_status("Sesja wczytana")
-            
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie można wczytać sesji:\n{e}")
+            return
+        
+        # What was just loaded is already saved
+        if self.matcher.base_source:
+            self._saved_session_key = repr(self._session_data())
+        
+        if errors:
+            self._set_status("Sesja wczytana częściowo")
+            messagebox.showerror("Błąd", "Nie można wczytać części plików sesji:\n" + "\n".join(errors))
+        else:
+            self._set_status("Sesja wczytana")
     
     def _show_batch_filter(self):
         """Show batch filter dialog."""
         from gui.dialogs.batch_filter import BatchFilterDialog
+        from utils.session import BatchFilter
         
         # Get current filter or create new
         current_filter = getattr(self, 'batch_filter', None) or BatchFilter()
@@ -888,6 +1277,8 @@ class MainApplication:
     
     def _check_startup_session(self):
         """Check for saved session on startup."""
+        from utils.session import SessionManager
+        
         info = SessionManager.get_session_info()
         if info:
             from gui.dialogs.batch_filter import LastSessionDialog
@@ -897,9 +1288,13 @@ class MainApplication:
     
     def _on_close(self):
         """Handle window close."""
-        # Auto-save session
+        # Auto-save session (skipped when it matches the last saved one)
         self._save_session(silent=True)
         
+        if self._config_flush_job is not None:
+            self.root.after_cancel(self._config_flush_job)
+            self._config_flush_job = None
+        
         # Save window position
         self.config.window_width = self.root.winfo_width()
         self.config.window_height = self.root.winfo_height()
@@ -910,6 +1305,11 @@ class MainApplication:
         self.config.strip_leading_zeros = self.strip_zeros_var.get()
         self.config.save()
         
+        # Drop queued work and stop running previews and key rebuilds,
+        # so exit does not wait for them
+        request_shutdown()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        shutdown_load_pool()
         self.root.destroy()
     
     def run(self):
@@ -7,6 +7,7 @@ from typing import Optional, Callable, List, Dict, Any
 
 from utils.file_handlers import load_file, get_file_info
 from utils.key_normalizer import get_key_stats, detect_key_column
+from utils.workers import get_load_pool, call_in_ui
 from core.data_source import DataSource
 from gui.widgets.tooltip import ToolTip
 
@@ -26,6 +27,13 @@ class BaseFilePanel(ttk.LabelFrame):
         self.data_source: Optional[DataSource] = None
         self.sheets: List[str] = []
         
+        # Pending debounced combobox handlers
+        self._sheet_debounce = None
+        self._key_debounce = None
+        
+        # Columns currently listed in the key combobox
+        self._key_columns: tuple = ()
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -132,19 +140,18 @@ class BaseFilePanel(ttk.LabelFrame):
         self.load_btn.config(state='disabled', text="⏳ Wczytywanie pliku...")
         self.file_label.config(text=f"Wczytywanie: {filepath}...")
         
-        import threading
-        
         def load_task():
             try:
                 # Create data source (heavy IO)
                 data_source = DataSource(filepath=filepath)
-                sheets = data_source.load(sheet)
-                return (data_source, sheets, None)
+                sheets = data_source.load(sheet, keep_workbook=True)
+                file_info = get_file_info(filepath)
+                return (data_source, sheets, file_info, None)
             except Exception as e:
-                return (None, None, str(e))
+                return (None, None, None, str(e))
         
         def on_complete(result):
-            data_source, sheets, error = result
+            data_source, sheets, file_info, error = result
             
             self.load_btn.config(state='normal', text="📂 Wczytaj plik bazowy...")
             
@@ -154,72 +161,97 @@ class BaseFilePanel(ttk.LabelFrame):
                 self.file_label.config(text="Plik: (błąd wczytywania)")
                 return
             
-            # Success - update UI
-            self.data_source = data_source
-            self.sheets = sheets
-            
-            # Update file info
-            file_info = get_file_info(filepath)
-            self.file_label.config(text=f"Plik: {file_info['name']}")
-            
-            # Show/hide sheet selector
-            if file_info['is_excel'] and len(self.sheets) > 1:
-                self.sheet_combo['values'] = self.sheets
-                self.sheet_var.set(self.data_source.sheet or self.sheets[0])
-                self.sheet_frame.grid()
-            else:
-                self.sheet_frame.grid_remove()
-            
-            # Update stats
-            self._update_stats()
-            
-            # Update key column options
-            columns = self.data_source.get_columns()
-            self.key_combo['values'] = columns
-            
-            # Notify callback first (so MainApplication has the source)
-            if self.on_file_loaded:
-                self.on_file_loaded(self.data_source)
-            
-            # Try to auto-detect key column
-            suggested = detect_key_column(columns, self.data_source.dataframe)
-            if suggested:
-                self.key_var.set(suggested)
-                self._on_key_changed()
-            
-            # Enable preview
-            self.preview_btn.config(state='normal')
+            self.set_source(data_source, sheets, file_info)
         
-        def thread_target():
-            result = load_task()
-            self.after(0, lambda: on_complete(result))
-            
-        threading.Thread(target=thread_target, daemon=True).start()
+        future = get_load_pool().submit(load_task)
+        future.add_done_callback(lambda f: f.cancelled() or call_in_ui(self, on_complete, f.result()))
     
     def load_from_path(self, filepath: str, sheet: Optional[str] = None):
         """Load file from specified path (public API)."""
         self._load_file_threaded(filepath, sheet)
     
+    def set_source(self, data_source: DataSource, sheets: List[str],
+                   file_info: Optional[Dict[str, Any]] = None):
+        """Show an already loaded data source (public API).
+        
+        Pass file_info (from get_file_info) when it was computed off the UI thread.
+        """
+        self.data_source = data_source
+        self.sheets = sheets
+        
+        # Update file info
+        if file_info is None:
+            file_info = get_file_info(data_source.filepath)
+        self.file_label.config(text=f"Plik: {file_info['name']}")
+        
+        # Show/hide sheet selector
+        if file_info['is_excel'] and len(self.sheets) > 1:
+            self.sheet_combo['values'] = self.sheets
+            self.sheet_var.set(self.data_source.sheet or self.sheets[0])
+            self.sheet_frame.grid()
+        else:
+            self.sheet_frame.grid_remove()
+        
+        # Update stats
+        self._update_stats()
+        
+        # Update key column options
+        columns = self.data_source.get_columns()
+        self._set_key_columns(columns)
+        
+        # Notify callback first (so MainApplication has the source)
+        if self.on_file_loaded:
+            self.on_file_loaded(self.data_source)
+        
+        # Keep a key column set by the caller, otherwise try to auto-detect it
+        key_col = self.data_source.key_column or detect_key_column(columns, self.data_source.dataframe)
+        if key_col:
+            self.key_var.set(key_col)
+            self._do_key_changed()
+        
+        # Enable preview
+        self.preview_btn.config(state='normal')
+    
     def _on_sheet_changed(self, event=None):
-        """Handle sheet selection change."""
+        """Handle sheet selection change (only the last of rapid selections)."""
+        if self._sheet_debounce:
+            self.after_cancel(self._sheet_debounce)
+        self._sheet_debounce = self.after(150, self._do_sheet_changed)
+    
+    def _do_sheet_changed(self):
+        """Load the selected sheet."""
+        self._sheet_debounce = None
         if not self.data_source:
             return
         
         sheet = self.sheet_var.get()
-        self.data_source.load(sheet)
+        self.data_source.switch_sheet(sheet)
         self._update_stats()
         
         # Update columns
         columns = self.data_source.get_columns()
-        self.key_combo['values'] = columns
+        self._set_key_columns(columns)
         
         # Reset key if not in new columns
         if self.key_var.get() not in columns:
             self.key_var.set('')
             self._update_key_stats()
     
+    def _set_key_columns(self, columns: tuple):
+        """Fill the key combobox, skipping the update if the columns are unchanged."""
+        if columns != self._key_columns:
+            self._key_columns = columns
+            self.key_combo['values'] = columns
+    
     def _on_key_changed(self, event=None):
-        """Handle key column selection change."""
+        """Handle key column selection change (only the last of rapid selections)."""
+        if self._key_debounce:
+            self.after_cancel(self._key_debounce)
+        self._key_debounce = self.after(150, self._do_key_changed)
+    
+    def _do_key_changed(self):
+        """Apply the selected key column."""
+        self._key_debounce = None
         if not self.data_source:
             return
         
@@ -236,8 +268,7 @@ class BaseFilePanel(ttk.LabelFrame):
         if not self.data_source or self.data_source.dataframe is None:
             return
         
-        rows = len(self.data_source.dataframe)
-        cols = len(self.data_source.dataframe.columns)
+        rows, cols = self.data_source.shape
         
         self.rows_label.config(text=f"Wierszy: {rows:,}")
         self.cols_label.config(text=f"Kolumn: {cols}")
@@ -302,6 +333,11 @@ class BaseFilePanel(ttk.LabelFrame):
     
     def reset(self):
         """Reset panel to initial state."""
+        for job in (self._sheet_debounce, self._key_debounce):
+            if job:
+                self.after_cancel(job)
+        self._sheet_debounce = None
+        self._key_debounce = None
         self.data_source = None
         self.sheets = []
         self.file_label.config(text="Plik: (nie wczytano)")
@@ -310,7 +346,7 @@ class BaseFilePanel(ttk.LabelFrame):
         self.sheet_frame.grid_remove()
         self.rows_label.config(text="Wierszy: -")
         self.cols_label.config(text="Kolumn: -")
-        self.key_combo['values'] = []
+        self._set_key_columns(())
         self.key_var.set('')
         self.unique_label.config(text="Unikalne klucze: -")
         self.duplicates_label.config(text="Duplikaty: -", foreground='')
@@ -7,9 +7,28 @@ from tkinter import ttk
 from typing import Optional, Callable, List, Dict, Any
 
 from core.mapping import ColumnMapping, WriteMode, MappingManager
+from core.transformer import get_transform_names
 from gui.widgets.tooltip import ToolTip
 from gui.widgets.colored_treeview import MappingsTreeview
-from gui.dialogs.mapping_editor import find_matching_column
+from gui.dialogs.mapping_editor import (
+    MappingEditorDialog, SmartMappingSuggestionDialog, find_matching_column
+)
+
+
+# Row number strings shared across tree refreshes
+_ROW_NUMS = [str(i) for i in range(1, 1001)]
+
+# Write mode choices for the quick bar: (value, display name)
+_MODE_CHOICES = [(mode.value, WriteMode.get_display_name(mode)) for mode in WriteMode]
+_MODE_DISPLAY_TO_VALUE = {display: value for value, display in _MODE_CHOICES}
+
+# Write mode and transform names cut to the tree column widths
+_MODE_NAMES = {mode: name[:15] for mode, name in WriteMode.get_all_display_names().items()}
+_TRANSFORM_NAMES = {tid: name[:12] for tid, name in get_transform_names().items()}
+
+# Most typeahead matches listed in the quick-bar dropdown (the unfiltered list is complete)
+_TARGET_COMBO_LIMIT = 100
+_NEW_COLUMN_ITEM = '+ NOWA KOLUMNA...'
 
 
 class MappingsPanel(ttk.LabelFrame):
@@ -32,6 +51,15 @@ class MappingsPanel(ttk.LabelFrame):
         
         # Mappings for quick bar
         self.source_name_to_id: Dict[str, str] = {}
+        self._first_source_name = ''
+        
+        # Lowercased target columns for quick-bar typeahead, and its debounce job
+        self._target_cols_lower: List[str] = []
+        self._target_filter_job = None
+        
+        # find_matching_column results for the current target columns
+        # (source column -> target column, '' when nothing matches)
+        self._match_cache: Dict[str, str] = {}
         
         self._create_widgets()
     
@@ -72,6 +100,7 @@ class MappingsPanel(ttk.LabelFrame):
         )
         self.quick_target_col_combo.pack(side=tk.LEFT, padx=(5, 5))
         ToolTip(self.quick_target_col_combo, "Kolumna docelowa")
+        self.quick_target_col_combo.bind('<KeyRelease>', self._on_quick_target_typed)
         
         # Mode
         self.quick_mode_var = tk.StringVar(value=WriteMode.get_display_name(WriteMode.FILL_EMPTY))
@@ -79,9 +108,8 @@ class MappingsPanel(ttk.LabelFrame):
             quick_frame, textvariable=self.quick_mode_var,
             state='readonly', width=15
         )
-        modes = [(mode.value, WriteMode.get_display_name(mode)) for mode in WriteMode]
-        self.mode_display_to_value = {display: value for value, display in modes}
-        self.quick_mode_combo['values'] = [display for _, display in modes]
+        self.mode_display_to_value = _MODE_DISPLAY_TO_VALUE
+        self.quick_mode_combo['values'] = [display for _, display in _MODE_CHOICES]
         self.quick_mode_combo.pack(side=tk.LEFT, padx=(0, 5))
         ToolTip(self.quick_mode_combo, "Tryb zapisu")
         
@@ -146,11 +174,10 @@ class MappingsPanel(ttk.LabelFrame):
     
     def _on_quick_source_changed(self, event=None):
         """Handle quick source selection."""
-        source_name = self.quick_source_var.get()
-        source_id = self.source_name_to_id.get(source_name)
+        source_id = self.source_name_to_id.get(self.quick_source_var.get())
+        cols = self.source_columns.get(source_id) if source_id else None
         
-        if source_id and source_id in self.source_columns:
-            cols = self.source_columns[source_id]
+        if cols is not None:
             self.quick_source_col_combo['values'] = cols
             if cols:
                 self.quick_source_col_var.set(cols[0])
@@ -163,12 +190,34 @@ class MappingsPanel(ttk.LabelFrame):
             return
             
         # Try to find match
-        match = find_matching_column(source_col, self.target_columns)
+        match = self._match_cache.get(source_col)
+        if match is None:
+            match = find_matching_column(source_col, self.target_columns) or ''
+            self._match_cache[source_col] = match
         if match:
             self.quick_target_col_var.set(match)
         else:
             self.quick_target_col_var.set(source_col) # Default to same name (new column)
     
+    def _on_quick_target_typed(self, event=None):
+        """Narrow the target dropdown after a short pause in typing."""
+        if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        if self._target_filter_job:
+            self.after_cancel(self._target_filter_job)
+        self._target_filter_job = self.after(150, self._filter_quick_targets)
+    
+    def _filter_quick_targets(self):
+        """Show target columns containing the typed text (at most _TARGET_COMBO_LIMIT matches)."""
+        self._target_filter_job = None
+        query = self.quick_target_col_var.get().lower()
+        if query:
+            matches = [col for col, low in zip(self.target_columns, self._target_cols_lower) if query in low]
+            matches = matches[:_TARGET_COMBO_LIMIT]
+        else:
+            matches = self.target_columns
+        self.quick_target_col_combo['values'] = matches + [_NEW_COLUMN_ITEM]
+    
     def _quick_add(self):
         """Add mapping from quick bar."""
         source_name = self.quick_source_var.get()
@@ -189,7 +238,7 @@ class MappingsPanel(ttk.LabelFrame):
             source_column=source_col,
             target_column=target_col,
             target_is_new=target_is_new,
-            write_mode=WriteMode(self.mode_display_to_value.get(mode_display, 'overwrite'))
+            write_mode=WriteMode(_MODE_DISPLAY_TO_VALUE.get(mode_display, 'overwrite'))
         )
         
         self.mapping_manager.add(mapping)
@@ -208,12 +257,10 @@ class MappingsPanel(ttk.LabelFrame):
             messagebox.showwarning("Brak pliku bazowego", "Najpierw wczytaj plik bazowy.")
             return
         
-        from gui.dialogs.mapping_editor import SmartMappingSuggestionDialog
-        
         # Use first source for suggestions (or currently selected in quick bar)
         source_name = self.quick_source_var.get()
-        if not source_name and self.sources:
-            source_name = list(self.sources.values())[0]
+        if not source_name:
+            source_name = self._first_source_name
             
         source_id = self.source_name_to_id.get(source_name)
         if not source_id:
@@ -229,7 +276,7 @@ class MappingsPanel(ttk.LabelFrame):
         )
         
         if dialog.result:
-            added_count = 0
+            new_mappings = []
             for sug in dialog.result:
                 # Get write_mode from dialog or default to OVERWRITE
                 write_mode = sug.get('write_mode', WriteMode.OVERWRITE)
@@ -244,8 +291,10 @@ class MappingsPanel(ttk.LabelFrame):
                     target_is_new=sug.get('target_is_new', False),
                     write_mode=write_mode
                 )
-                self.mapping_manager.add(mapping)
-                added_count += 1
+                new_mappings.append(mapping)
+            
+            self.mapping_manager.add_many(new_mappings)
+            added_count = len(new_mappings)
             
             self._refresh_tree()
             self._notify_change()
@@ -260,13 +309,9 @@ class MappingsPanel(ttk.LabelFrame):
         if not selected:
             return
         
-        for item in selected:
-            values = self.tree.get_row_data(item)
-            if values:
-                idx = int(values[0]) - 1
-                if 0 <= idx < len(self.mapping_manager.mappings):
-                    mapping = self.mapping_manager.mappings[idx]
-                    self.mapping_manager.remove(mapping.id)
+        # Tree item IDs are mapping IDs
+        for mapping_id in selected:
+            self.mapping_manager.remove(mapping_id)
         
         self._refresh_tree()
         self._notify_change()
@@ -276,40 +321,26 @@ class MappingsPanel(ttk.LabelFrame):
         selected = self.tree.get_selected_items()
         if not selected:
             return
-        values = self.tree.get_row_data(selected[0])
-        if values:
-            idx = int(values[0]) - 1
-            if idx > 0:
-                mapping = self.mapping_manager.mappings[idx]
-                self.mapping_manager.move_up(mapping.id)
-                self._refresh_tree()
-                self._notify_change()
-                
-                # Restore selection (new index is idx - 1)
-                self._select_index(idx - 1)
+        mapping_id = selected[0]
+        if self.mapping_manager.move_up(mapping_id):
+            self._refresh_tree()
+            self._notify_change()
+            self._select_item(mapping_id)
     
     def _move_down(self):
         """Move selected mapping down."""
         selected = self.tree.get_selected_items()
         if not selected:
             return
-        values = self.tree.get_row_data(selected[0])
-        if values:
-            idx = int(values[0]) - 1
-            if idx < len(self.mapping_manager.mappings) - 1:
-                mapping = self.mapping_manager.mappings[idx]
-                self.mapping_manager.move_down(mapping.id)
-                self._refresh_tree()
-                self._notify_change()
-                
-                # Restore selection (new index is idx + 1)
-                self._select_index(idx + 1)
+        mapping_id = selected[0]
+        if self.mapping_manager.move_down(mapping_id):
+            self._refresh_tree()
+            self._notify_change()
+            self._select_item(mapping_id)
     
-    def _select_index(self, index: int):
-        """Select row by index."""
-        children = self.tree.get_children()
-        if 0 <= index < len(children):
-            item = children[index]
+    def _select_item(self, item: str):
+        """Select row by item ID."""
+        if self.tree.exists(item):
             self.tree.selection_set(item)
             self.tree.focus(item)
             self.tree.see(item)
@@ -328,40 +359,38 @@ class MappingsPanel(ttk.LabelFrame):
     
     def _on_double_click(self, item):
         """Handle double-click to edit mapping."""
-        values = self.tree.get_row_data(item)
-        if not values:
+        # Tree item IDs are mapping IDs
+        mapping = self.mapping_manager.get(item)
+        if not mapping:
             return
         
-        idx = int(values[0]) - 1
-        if 0 <= idx < len(self.mapping_manager.mappings):
-            mapping = self.mapping_manager.mappings[idx]
-            
-            from gui.dialogs.mapping_editor import MappingEditorDialog
-            
-            dialog = MappingEditorDialog(
-                self.winfo_toplevel(),
-                sources=self.sources,
-                source_columns=self.source_columns,
-                target_columns=self.target_columns,
-                mapping=mapping,
-                title="Edycja mapowania"
-            )
-            
-            if dialog.result:
-                self.mapping_manager.update(dialog.result)
-                self._refresh_tree()
-                self._notify_change()
+        dialog = MappingEditorDialog(
+            self.winfo_toplevel(),
+            sources=self.sources,
+            source_columns=self.source_columns,
+            target_columns=self.target_columns,
+            mapping=mapping,
+            title="Edycja mapowania"
+        )
+        
+        if dialog.result:
+            self.mapping_manager.update(dialog.result)
+            self._refresh_tree()
+            self._notify_change()
     
     def _refresh_tree(self):
         """Refresh tree view with current mappings."""
-        self.tree.clear()
+        transform_names = _TRANSFORM_NAMES
+        mode_names = _MODE_NAMES
         
-        from core.transformer import get_transform_names
-        transform_names = get_transform_names()
+        source_names = {sid: name[:20] for sid, name in self.sources.items()}
         
+        rows = []
         for i, mapping in enumerate(self.mapping_manager.mappings, 1):
-            source_name = self.sources.get(mapping.source_id, mapping.source_name)
-            mode_name = WriteMode.get_display_name(mapping.write_mode)
+            source_name = source_names.get(mapping.source_id)
+            if source_name is None:
+                source_name = mapping.source_name[:20]
+            mode_name = mode_names.get(mapping.write_mode) or mapping.write_mode.value[:15]
             transform_name = transform_names.get(mapping.transform, '-') if mapping.transform else '-'
             
             target_display = mapping.target_column
@@ -369,17 +398,19 @@ class MappingsPanel(ttk.LabelFrame):
                 target_display = f"+ {mapping.target_column} (NOWA)"
             
             values = (
-                str(i),
-                source_name[:20],
+                _ROW_NUMS[i - 1] if i <= len(_ROW_NUMS) else str(i),
+                source_name,
                 mapping.source_column[:20],
                 '→',
                 target_display[:20],
-                mode_name[:15],
-                transform_name[:12]
+                mode_name,
+                transform_name
             )
             
             tag = 'unchanged' if mapping.enabled else 'conflict'
-            self.tree.add_row(values, tag=tag)
+            rows.append((values, tag))
+        
+        self.tree.bulk_update(rows, iids=[m.id for m in self.mapping_manager.mappings])
         
         # Show/hide empty label
         if len(self.mapping_manager) == 0:
@@ -397,20 +428,24 @@ class MappingsPanel(ttk.LabelFrame):
         self.sources = sources
         self.source_columns = source_columns
         self.source_name_to_id = {name: sid for sid, name in sources.items()}
+        self._first_source_name = next(iter(sources.values()), '')
         
         # Update quick bar combos
         self.quick_source_combo['values'] = list(sources.values())
         if sources:
             # Select first source if none selected
             if not self.quick_source_var.get():
-                first_source = list(sources.values())[0]
-                self.quick_source_var.set(first_source)
+                self.quick_source_var.set(self._first_source_name)
                 self._on_quick_source_changed()
     
     def set_target_columns(self, columns: List[str]):
         """Update available target columns."""
+        columns = list(columns)
+        if columns != self.target_columns:
+            self._match_cache = {}
         self.target_columns = columns
-        self.quick_target_col_combo['values'] = columns + ['+ NOWA KOLUMNA...']
+        self._target_cols_lower = [c.lower() for c in columns]
+        self.quick_target_col_combo['values'] = self.target_columns + [_NEW_COLUMN_ITEM]
     
     def get_mapping_manager(self) -> MappingManager:
         """Get the mapping manager."""
@@ -426,7 +461,14 @@ class MappingsPanel(ttk.LabelFrame):
         self.mapping_manager.clear()
         self.sources.clear()
         self.source_columns.clear()
+        self.source_name_to_id = {}
+        self._first_source_name = ''
         self.target_columns.clear()
+        self._target_cols_lower = []
+        if self._target_filter_job:
+            self.after_cancel(self._target_filter_job)
+            self._target_filter_job = None
+        self._match_cache = {}
         self.quick_source_combo.set('')
         self.quick_source_col_combo.set('')
         self.quick_target_col_combo.set('')
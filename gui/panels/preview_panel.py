@@ -3,13 +3,16 @@ Preview Panel - Panel for previewing changes before execution.
 Enhanced with before/after view, search, diff export, and batch control.
 """
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, messagebox
 from typing import Optional, Callable, List, Dict, Any
+import numpy as np
 import pandas as pd
 
 from gui.widgets.tooltip import ToolTip
 from gui.widgets.colored_treeview import PreviewTreeview, COLORS
 from core.matcher import ChangeType
+from utils.file_handlers import save_excel
+from utils.workers import get_export_pool, call_in_ui
 
 
 class PreviewPanel(ttk.LabelFrame):
@@ -18,18 +21,68 @@ class PreviewPanel(ttk.LabelFrame):
     Supports search, before/after view, diff export, and batch filtering.
     """
     
+    # Row statuses, stored per row as int8 codes (index in this tuple).
+    # Ordered by priority: a row shows the highest status of its changes.
+    STATUSES = ('unchanged', 'skipped', 'new', 'changed', 'no_match')
+    _STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    
+    # Status code of each change type (others leave the row unchanged)
+    _CHANGE_STATUS = {
+        ChangeType.SKIPPED: _STATUS_CODES['skipped'],
+        ChangeType.NEW: _STATUS_CODES['new'],
+        ChangeType.CHANGED: _STATUS_CODES['changed'],
+        ChangeType.NO_MATCH: _STATUS_CODES['no_match'],
+    }
+    
+    # Filtered rows formatted together when the tree first shows one of them
+    DISPLAY_BLOCK = 200
+    
+    # Row status codes shown by each filter (None = all rows)
+    FILTER_STATUSES = {
+        'all': None,
+        'changed': [_STATUS_CODES['changed'], _STATUS_CODES['new']],
+        'unmatched': [_STATUS_CODES['no_match']],
+        'skipped': [_STATUS_CODES['skipped']],
+    }
+    
     def __init__(self, master, **kwargs):
         super().__init__(master, text="👁️ PODGLĄD WYNIKU", padding=10, **kwargs)
         
         self.preview_data: Optional[pd.DataFrame] = None
         self.changes: List[Any] = []
         self.column_names: List[str] = []
+        self._ba_columns: List[str] = []  # Columns paired in before/after mode
         self.before_after_mode = False
         self._refresh_callback = None
         
+        # Search debounce and the last search that matched no rows
+        self._filter_after_id = None
+        self._empty_search: Optional[tuple] = None  # (filter_type, search_text)
+        
         # Store before values for before/after display
         self.before_values: Dict[tuple, Any] = {}  # (row_idx, col) -> old_value
         
+        # Per-row status code (by position) and lowercased row text for searching
+        self._row_status_array: Optional[np.ndarray] = None
+        self._row_search_cache: Optional[pd.Series] = None
+        
+        # Last search and its matching row positions (refined while typing)
+        self._last_search = ''
+        self._last_search_positions: np.ndarray = np.empty(0, dtype=np.intp)
+        
+        # Filtered row positions materialized by the tree while scrolling
+        self._visible_positions: np.ndarray = np.empty(0, dtype=np.intp)
+        self._hidden_rows = 0
+        self._before_df: Optional[pd.DataFrame] = None
+        
+        # Formatted rows by block of filtered rows (block number -> list of value tuples)
+        self._display_blocks: Dict[int, List[tuple]] = {}
+        self._tree_columns: List[str] = ['Dane']
+        
+        # Inputs of the last filter run; _data_version changes with the data
+        self._data_version = 0
+        self._last_filter_key: Optional[tuple] = None
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -75,7 +128,7 @@ class PreviewPanel(ttk.LabelFrame):
         ttk.Label(search_frame, text="🔍 Szukaj:").pack(side=tk.LEFT)
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self._apply_filter())
+        self.search_var.trace('w', lambda *args: self._on_search_changed())
         
         self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=25)
         self.search_entry.pack(side=tk.LEFT, padx=5)
@@ -177,41 +230,46 @@ class PreviewPanel(ttk.LabelFrame):
         self.preview_data = df
         self.changes = changes or []
         self.column_names = list(df.columns)
+        self._ba_columns = self.column_names[:10]  # Limit for readability
         
         # Build before_values lookup from changes
-        self.before_values = {}
-        for change in self.changes:
-            if change.change_type in (ChangeType.NEW, ChangeType.CHANGED):
-                self.before_values[(change.row_index, change.column)] = change.old_value
+        written = (ChangeType.NEW, ChangeType.CHANGED)
+        self.before_values = {
+            (change.row_index, change.column): change.old_value
+            for change in self.changes if change.change_type in written
+        }
+        
+        self._row_status_array = df.index.map(self._build_row_status()).fillna(0).to_numpy(dtype=np.int8)
+        self._row_search_cache = None  # Built on the first search
+        self._last_search = ''
+        self._before_df = None  # Built when the before/after view is first shown
+        self._data_version += 1
         
         # Rebuild tree
         self._rebuild_tree()
         self._apply_filter()
     
     def _rebuild_tree(self):
-        """Rebuild tree with current columns."""
+        """Reconfigure the tree columns for the current data and mode."""
         if not self.column_names:
             return
         
-        tree_frame = self.tree.master
-        
-        # Destroy old tree
-        self.tree.v_scroll.destroy()
-        self.tree.h_scroll.destroy()
-        self.tree.destroy()
-        
         # Determine columns based on mode
         if self.before_after_mode:
             # Create paired columns: [Col1_OLD, Col1_NEW, Col2_OLD, Col2_NEW, ...]
             display_columns = []
-            for col in self.column_names[:10]:  # Limit for readability
+            for col in self._ba_columns:
                 display_columns.append(f"{col} (PRZED)")
                 display_columns.append(f"{col} (PO)")
         else:
-            display_columns = self.column_names
+            display_columns = list(self.column_names)
         
-        self.tree = PreviewTreeview(tree_frame, columns=display_columns)
-        self.tree.grid_with_scrollbars(0, 0)
+        # Same columns as shown (e.g. repeated refresh) - nothing to do
+        if display_columns == self._tree_columns:
+            return
+        
+        self.tree.set_data_columns(display_columns)
+        self._tree_columns = display_columns
     
     def _toggle_before_after(self):
         """Toggle before/after display mode."""
@@ -227,115 +285,188 @@ class PreviewPanel(ttk.LabelFrame):
             self.limit_spinbox.config(state='disabled')
         self._apply_filter()
     
+    def _build_row_status(self) -> pd.Series:
+        """Status code per row index: the highest-priority status of the row's changes."""
+        change_status = self._CHANGE_STATUS
+        codes = pd.Series(
+            [change_status.get(change.change_type, 0) for change in self.changes],
+            index=[change.row_index for change in self.changes],
+            dtype=np.int8
+        )
+        codes = codes[codes > 0]
+        return codes.groupby(level=0).max()
+    
+    def _get_search_cache(self) -> pd.Series:
+        """Lowercased text of every row, cells joined with \\x1f (built once per data set)."""
+        if self._row_search_cache is None:
+            df = self.preview_data
+            # Column by column - one array of the whole frame would be as
+            # wide as its longest cell
+            cols = [
+                df.iloc[:, i].astype(str).reset_index(drop=True)
+                for i in range(df.shape[1])
+            ]
+            if not cols:
+                cache = pd.Series('', index=range(len(df)), dtype=object)
+            else:
+                cache = cols[0].str.cat(cols[1:], sep='\x1f', na_rep='nan')
+            self._row_search_cache = cache.str.lower()
+        return self._row_search_cache
+    
+    def _get_before_df(self) -> pd.DataFrame:
+        """Old values as a row index x column frame (NaN where unchanged), built once per data set."""
+        if self._before_df is None:
+            if self.before_values:
+                # object dtype keeps integer old values from turning into floats
+                self._before_df = pd.Series(self.before_values, dtype=object).unstack()
+            else:
+                self._before_df = pd.DataFrame()
+        return self._before_df
+    
+    def _search_positions(self, search_text: str) -> np.ndarray:
+        """Positions of rows containing search_text (lowercased)."""
+        # Same query (e.g. only the status filter or limit changed)
+        last = self._last_search
+        if last and search_text == last:
+            return self._last_search_positions
+        
+        cache = self._get_search_cache()
+        
+        # A longer query can only match rows the shorter one matched
+        if last and search_text.startswith(last):
+            candidates = self._last_search_positions
+            hits = cache.iloc[candidates].str.contains(search_text, regex=False).to_numpy()
+            positions = candidates[hits]
+        else:
+            positions = np.flatnonzero(cache.str.contains(search_text, regex=False).to_numpy())
+        
+        self._last_search = search_text
+        self._last_search_positions = positions
+        return positions
+    
+    def _on_search_changed(self):
+        """Filter after a short pause in typing instead of on every keystroke."""
+        if self._filter_after_id:
+            self.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        
+        # Extending a search that matched nothing cannot match anything either
+        if self._empty_search:
+            filter_type, search_text = self._empty_search
+            if (filter_type == self.filter_var.get()
+                    and self.search_var.get().lower().startswith(search_text)):
+                return
+        
+        self._filter_after_id = self.after(200, self._apply_filter)
+    
     def _apply_filter(self):
         """Apply current filter to preview."""
+        if self._filter_after_id:
+            self.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        
         if self.preview_data is None:
             return
         
-        self.tree.clear()
-        
         filter_type = self.filter_var.get()
         search_text = self.search_var.get().lower()
         
-        # Use limit only if enabled
+        # Use limit only if enabled (only visible rows are materialized,
+        # so no hard cap is needed without a limit)
         if self.limit_enabled_var.get():
-            max_rows = self.limit_var.get()
+            max_rows = min(self.limit_var.get(), 2000)
         else:
-            max_rows = 2000  # Hard limit for GUI performance
-            
-        # Safety cap to prevent UI freeze
-        if max_rows > 2000:
-            max_rows = 2000
+            max_rows = len(self.preview_data)
+        
+        # Nothing changed since the last run (e.g. a character typed and deleted)
+        filter_key = (filter_type, search_text, max_rows, self.before_after_mode, self._data_version)
+        if filter_key == self._last_filter_key:
+            return
+        self._last_filter_key = filter_key
+        self._empty_search = None
+        
+        # Status filter
+        allowed = self.FILTER_STATUSES.get(filter_type)
+        status_mask = np.isin(self._row_status_array, allowed) if allowed is not None else None
+        
+        # Apply search
+        if search_text:
+            positions = self._search_positions(search_text)
+            if status_mask is not None:
+                positions = positions[status_mask[positions]]
+        elif status_mask is not None:
+            positions = np.flatnonzero(status_mask)
+        else:
+            positions = np.arange(len(self.preview_data))
         
-        # Build change lookup
-        change_lookup: Dict[tuple, ChangeType] = {}
-        row_status: Dict[int, str] = {}
+        self._hidden_rows = len(positions) - min(len(positions), max_rows)
+        self._visible_positions = positions[:max_rows]
+        self._display_blocks = {}
         
-        for change in self.changes:
-            key = (change.row_index, change.column)
-            change_lookup[key] = change.change_type
-            
-            current = row_status.get(change.row_index, 'unchanged')
-            if change.change_type == ChangeType.NO_MATCH:
-                row_status[change.row_index] = 'no_match'
-            elif change.change_type == ChangeType.SKIPPED:
-                if current not in ('no_match', 'changed', 'new'):
-                    row_status[change.row_index] = 'skipped'
-            elif change.change_type == ChangeType.CHANGED and current not in ('no_match',):
-                row_status[change.row_index] = 'changed'
-            elif change.change_type == ChangeType.NEW and current not in ('no_match', 'changed'):
-                row_status[change.row_index] = 'new'
-        
-        # Filter and display
-        count = 0
-        
-        for idx, row in self.preview_data.iterrows():
-            if count >= max_rows:
-                break
-            
-            status = row_status.get(idx, 'unchanged')
-            
-            # Apply filter
-            if filter_type == 'changed' and status not in ('changed', 'new'):
-                continue
-            if filter_type == 'unmatched' and status != 'no_match':
-                continue
-            if filter_type == 'skipped' and status != 'skipped':
-                continue
-            
-            # Apply search
-            if search_text:
-                row_text = ' '.join(str(v).lower() for v in row.values)
-                if search_text not in row_text:
-                    continue
-            
-            # Build row values
-            if self.before_after_mode:
-                # Paired columns
-                values = []
-                for col in self.column_names[:10]:
-                    old_val = self.before_values.get((idx, col), '')
-                    new_val = row.get(col, '')
-                    
-                    old_str = str(old_val)[:30] if pd.notna(old_val) and old_val != '' else '-'
-                    new_str = str(new_val)[:30] if pd.notna(new_val) else ''
-                    
-                    values.append(old_str)
-                    values.append(new_str)
-                
-                values = tuple(values)
-            else:
-                values = tuple(str(v)[:50] if pd.notna(v) else '' for v in row.values)
-            
-            self.tree.add_row_with_status(values, status)
-            count += 1
+        count = len(self._visible_positions)
+        self.tree.set_virtual_rows(count + (1 if self._hidden_rows else 0), self._get_preview_row)
+        
+        if count == 0 and search_text:
+            self._empty_search = (filter_type, search_text)
+    
+    def _get_preview_row(self, k: int) -> tuple:
+        """Build (values, status) of the k-th filtered row for the tree."""
+        count = len(self._visible_positions)
         
-        # Show limit warning
-        if count >= max_rows:
-            remaining = len(self.preview_data) - max_rows
+        # Limit warning after the last shown row
+        if k >= count:
             if self.before_after_mode:
-                cols_count = len(self.column_names[:10]) * 2
+                cols_count = len(self._ba_columns) * 2
             else:
                 cols_count = len(self.column_names)
             
-            msg = ('...', f'(pokazano {max_rows}, pozostało {remaining:,})') + ('',) * (cols_count - 2)
-            self.tree.add_row(msg, tag='unchanged')
+            msg = ('...', f'(pokazano {count}, pozostało {self._hidden_rows:,})') + ('',) * (cols_count - 1)
+            return msg, None
+        
+        pos = self._visible_positions[k]
+        status = self.STATUSES[self._row_status_array[pos]]
+        
+        block, offset = divmod(k, self.DISPLAY_BLOCK)
+        rows = self._display_blocks.get(block)
+        if rows is None:
+            rows = self._format_block(block)
+        return rows[offset], status
+    
+    def _format_block(self, block: int) -> List[tuple]:
+        """Format one block of filtered rows for display, column by column."""
+        start = block * self.DISPLAY_BLOCK
+        positions = self._visible_positions[start:start + self.DISPLAY_BLOCK]
+        rows_df = self.preview_data.iloc[positions]
+        
+        if self.before_after_mode:
+            # Paired columns: old values ('-' if none) next to new values
+            # (the paired columns are the leading data columns)
+            old_df = self._get_before_df().reindex(index=rows_df.index, columns=self._ba_columns)
+            columns = []
+            for i in range(len(self._ba_columns)):
+                old = old_df.iloc[:, i]
+                new = rows_df.iloc[:, i]
+                columns.append(old.astype(str).str.slice(0, 30).where(old.notna() & (old != ''), '-').tolist())
+                columns.append(new.astype(str).str.slice(0, 30).where(new.notna(), '').tolist())
+        else:
+            columns = [
+                col.astype(str).str.slice(0, 50).where(col.notna(), '').tolist()
+                for col in (rows_df.iloc[:, i] for i in range(rows_df.shape[1]))
+            ]
+        rows = list(zip(*columns)) if columns else [()] * len(positions)
+        self._display_blocks[block] = rows
+        return rows
     
     def _export_diff(self):
         """Export only changed rows to Excel file."""
         if self.preview_data is None or not self.changes:
-            from tkinter import messagebox
             messagebox.showwarning("Brak danych", "Najpierw wygeneruj podgląd.")
             return
         
-        # Collect changed row indices
-        changed_rows = set()
-        for change in self.changes:
-            if change.change_type in (ChangeType.NEW, ChangeType.CHANGED):
-                changed_rows.add(change.row_index)
+        # Collect changed row indices (before_values holds exactly the new/changed cells)
+        changed_rows = {row for row, _ in self.before_values}
         
         if not changed_rows:
-            from tkinter import messagebox
             messagebox.showinfo("Brak zmian", "Nie ma żadnych zmian do wyeksportowania.")
             return
         
@@ -350,39 +481,54 @@ class PreviewPanel(ttk.LabelFrame):
         if not filepath:
             return
         
-        try:
+        preview_data = self.preview_data
+        before_values = self.before_values
+        column_names = list(self.column_names)
+        
+        def export() -> int:
             # Create diff dataframe
-            diff_df = self.preview_data.loc[list(changed_rows)].copy()
+            diff_df = preview_data[preview_data.index.isin(changed_rows)]
             
-            # Add before columns
-            for col in self.column_names:
-                old_values = []
-                for idx in diff_df.index:
-                    old_val = self.before_values.get((idx, col), '')
-                    old_values.append(old_val)
-                diff_df[f'{col}_PRZED'] = old_values
+            # Add before columns: pivot (row, column) -> old value, '' where unchanged
+            before_df = (
+                pd.Series(before_values, dtype=object)  # Keep ints as ints; '' fill fits
+                .unstack(fill_value='')
+                .reindex(index=diff_df.index, columns=column_names, fill_value='')
+            )
+            before_df.columns = [f'{col}_PRZED' for col in column_names]
+            diff_df = pd.concat([diff_df, before_df], axis=1)
             
             # Reorder columns: [original, before, original, before, ...]
             new_order = []
-            for col in self.column_names:
+            for col in column_names:
                 new_order.append(f'{col}_PRZED')
                 new_order.append(col)
             
             diff_df = diff_df[[c for c in new_order if c in diff_df.columns]]
             
             # Save with styling
-            from utils.file_handlers import save_excel
             save_excel(diff_df, filepath)
-            
-            from tkinter import messagebox
-            messagebox.showinfo(
-                "Eksport zakończony",
-                f"Wyeksportowano {len(diff_df)} zmienionych wierszy do:\n{filepath}"
-            )
-            
+            return len(diff_df)
+        
+        # Build and write the file in the background so the UI stays responsive
+        self.export_diff_btn.config(state='disabled')
+        future = get_export_pool().submit(export)
+        future.add_done_callback(lambda f: call_in_ui(self, self._on_export_done, f, filepath))
+    
+    def _on_export_done(self, future, filepath: str):
+        """Report the result of a background diff export."""
+        self.export_diff_btn.config(state='normal')
+        
+        try:
+            row_count = future.result()
         except Exception as e:
-            from tkinter import messagebox
             messagebox.showerror("Błąd eksportu", str(e))
+            return
+        
+        messagebox.showinfo(
+            "Eksport zakończony",
+            f"Wyeksportowano {row_count} zmienionych wierszy do:\n{filepath}"
+        )
     
     def _refresh(self):
         """Refresh preview."""
@@ -420,5 +566,11 @@ class PreviewPanel(ttk.LabelFrame):
         self.preview_data = None
         self.changes = []
         self.before_values = {}
+        self._row_status_array = None
+        self._row_search_cache = None
+        self._display_blocks = {}
+        self._last_search = ''
+        self._before_df = None
+        self._data_version += 1
         self.stats_label.config(text="STATYSTYKI: -")
         self.progress_var.set(0)
@@ -3,10 +3,12 @@ Sources Panel - Panel for managing data sources.
 """
 import tkinter as tk
 from tkinter import ttk, filedialog
-from typing import Optional, Callable, List, Dict, Any
+from typing import Optional, Callable, List, Dict, Any, Sequence
+import pandas as pd
 
 from utils.file_handlers import load_file, get_file_info
 from utils.key_normalizer import detect_key_column
+from utils.workers import get_load_pool, call_in_ui
 from core.data_source import DataSource
 from gui.widgets.tooltip import ToolTip
 
@@ -14,6 +16,9 @@ from gui.widgets.tooltip import ToolTip
 class SourceCard(ttk.Frame):
     """Card widget representing a single data source."""
     
+    # Unmatched keys inserted into the dialog per event-loop turn
+    UNMATCHED_BATCH = 500
+    
     def __init__(self, master, source: DataSource, 
                  on_key_changed: Optional[Callable] = None,
                  on_preview: Optional[Callable] = None,
@@ -25,7 +30,8 @@ class SourceCard(ttk.Frame):
         self.on_key_changed_callback = on_key_changed
         self.on_preview_callback = on_preview
         self.on_remove_callback = on_remove
-        self.base_keys = set()  # Store base keys for analysis
+        self.base_keys: Sequence[str] = ()  # Store base keys for analysis
+        self._base_index: Optional[pd.Index] = None  # Unique base keys, built on first analysis
         
         self._create_widgets()
     
@@ -139,39 +145,7 @@ class SourceCard(ttk.Frame):
         ).pack(fill=tk.X, pady=(0, 10))
         
         # Analysis logic
-        fixable_map = {}  # key -> fixed_key
-        
-        # Debug prints
-        print(f"DEBUG: Unmatched keys count: {len(self.unmatched_keys)}")
-        print(f"DEBUG: Base keys count: {len(self.base_keys)}")
-        if self.base_keys:
-            print(f"DEBUG: Sample base key: {list(self.base_keys)[0]} (type: {type(list(self.base_keys)[0])})")
-        if self.unmatched_keys:
-            print(f"DEBUG: Sample unmatched key: {self.unmatched_keys[0]} (type: {type(self.unmatched_keys[0])})")
-
-        for key in self.unmatched_keys:
-            s_key = str(key)
-            if not s_key or s_key.lower() == 'nan':
-                continue
-                
-            # Try stripping .0
-            if s_key.endswith('.0'):
-                fixed = s_key[:-2]
-                if fixed in self.base_keys:
-                    fixable_map[key] = fixed
-                    continue
-            
-            # Try stripping whitespace
-            fixed = s_key.strip()
-            if fixed != s_key and fixed in self.base_keys:
-                fixable_map[key] = fixed
-                continue
-                
-            # Try lowercase
-            fixed = s_key.lower()
-            if fixed != s_key and fixed in self.base_keys:
-                fixable_map[key] = fixed
-                continue
+        fixable_map = self._find_fixable_keys()  # key -> fixed_key
         
         # Listbox with scrollbar
         list_frame = ttk.Frame(frame)
@@ -196,54 +170,64 @@ class SourceCard(ttk.Frame):
         
         scrollbar.config(command=tree.yview)
         
-        # Populate
-        for key in self.unmatched_keys:
-            fix = fixable_map.get(key, "")
-            tags = ('fixable',) if fix else ()
-            tree.insert('', tk.END, values=(str(key), fix), tags=tags)
-            
         tree.tag_configure('fixable', foreground='green')
+        
+        # Populate in batches so the dialog shows up before all keys are inserted
+        keys = self.unmatched_keys
+        
+        def populate(start: int = 0):
+            if not tree.winfo_exists():
+                return
+            end = min(start + self.UNMATCHED_BATCH, len(keys))
+            for key in keys[start:end]:
+                fix = fixable_map.get(key, "")
+                tags = ('fixable',) if fix else ()
+                tree.insert('', tk.END, values=(str(key), fix), tags=tags)
+            if end < len(keys):
+                dialog.after(1, populate, end)
+        
+        populate()
             
         # Buttons
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill=tk.X, pady=(10, 0))
         
+        def replace_keys(mapping: Dict[str, str]):
+            """Replace source keys (compared as text) in one pass over the key column."""
+            df = self.source.dataframe
+            key_col = self.source.key_column
+            key_str = df[key_col].astype(str)
+            hits = key_str.isin(list(mapping))
+            df[key_col] = df[key_col].mask(hits, key_str.map(mapping))
+            self.source.mark_data_changed()
+        
         def copy_to_clipboard():
             keys_str = "\n".join(str(k) for k in self.unmatched_keys)
             dialog.clipboard_clear()
             dialog.clipboard_append(keys_str)
             
         def fix_selected():
+            # Collect fixes (all occurrences of each original key are updated)
             selected_items = tree.selection()
-            if not selected_items:
-                # If nothing selected, select all fixable
-                all_items = tree.get_children()
-                selected_items = [item for item in all_items if tree.item(item)['values'][1]]
+            if selected_items:
+                mapping = {}
+                for item in selected_items:
+                    fixed = tree.set(item, 'fix')
+                    if fixed:
+                        mapping[tree.set(item, 'key')] = fixed
+            else:
+                # If nothing selected, fix all fixable (also rows not inserted yet)
+                mapping = {str(key): fixed for key, fixed in fixable_map.items()}
             
-            if not selected_items:
+            if not mapping:
                 from tkinter import messagebox
                 messagebox.showinfo("Info", "Brak kluczy do naprawy.")
                 return
-            
-            count = 0
-            # Apply fixes
-            df = self.source.dataframe
-            key_col = self.source.key_column
-            
-            for item in selected_items:
-                values = tree.item(item)['values']
-                original = values[0]
-                fixed = values[1]
-                
-                if fixed:
-                    # Update dataframe
-                    # Note: This is a bit slow for many rows, but safe
-                    # Assuming original is unique or we update all occurrences
-                    mask = df[key_col].astype(str) == original
-                    df.loc[mask, key_col] = fixed
-                    count += 1
+            count = len(mapping)
             
             if count > 0:
+                replace_keys(mapping)
+                
                 # Rebuild index and refresh
                 self.source.build_key_lookup(force=True)
                 if self.on_key_changed_callback:
@@ -270,25 +254,16 @@ class SourceCard(ttk.Frame):
         force_frame.pack(fill=tk.X, pady=(10, 0))
         
         def force_fix_dot_zero():
-            count = 0
-            df = self.source.dataframe
-            key_col = self.source.key_column
-            
             # Get all unmatched keys that end with .0
-            targets = [k for k in self.unmatched_keys if str(k).endswith('.0')]
+            targets = [str(k) for k in self.unmatched_keys if str(k).endswith('.0')]
             
             if not targets:
                 from tkinter import messagebox
                 messagebox.showinfo("Info", "Brak kluczy z końcówką .0")
                 return
-                
-            for key in targets:
-                s_key = str(key)
-                fixed = s_key[:-2]
-                
-                mask = df[key_col].astype(str) == s_key
-                df.loc[mask, key_col] = fixed
-                count += 1
+            
+            replace_keys({s_key: s_key[:-2] for s_key in targets})
+            count = len(targets)
             
             if count > 0:
                 # Rebuild index
@@ -301,9 +276,6 @@ class SourceCard(ttk.Frame):
                 if self.on_key_changed_callback:
                     self.on_key_changed_callback(self.source)
                 
-                # Force UI update
-                self.update_idletasks()
-                
                 from tkinter import messagebox
                 messagebox.showinfo("Sukces", f"Naprawiono {count} kluczy (usunięto .0).\nStatystyki zostały zaktualizowane.")
 
@@ -313,25 +285,16 @@ class SourceCard(ttk.Frame):
         ).pack(side=tk.LEFT, padx=5)
         
         def force_fix_whitespace():
-            count = 0
-            df = self.source.dataframe
-            key_col = self.source.key_column
-            
-            targets = [k for k in self.unmatched_keys if str(k).strip() != str(k)]
+            targets = [str(k) for k in self.unmatched_keys if str(k).strip() != str(k)]
             
             if not targets:
                 from tkinter import messagebox
                 messagebox.showinfo("Info", "Brak kluczy ze spacjami do usunięcia")
                 return
-
-            for key in targets:
-                s_key = str(key)
-                fixed = s_key.strip()
-                
-                mask = df[key_col].astype(str) == s_key
-                df.loc[mask, key_col] = fixed
-                count += 1
-                
+            
+            replace_keys({s_key: s_key.strip() for s_key in targets})
+            count = len(targets)
+            
             if count > 0:
                 # Rebuild index
                 self.source.build_key_lookup(force=True)
@@ -343,9 +306,6 @@ class SourceCard(ttk.Frame):
                 if self.on_key_changed_callback:
                     self.on_key_changed_callback(self.source)
                 
-                # Force UI update
-                self.update_idletasks()
-                
                 from tkinter import messagebox
                 messagebox.showinfo("Sukces", f"Naprawiono {count} kluczy (usunięto spacje).\nStatystyki zostały zaktualizowane.")
 
@@ -360,7 +320,54 @@ class SourceCard(ttk.Frame):
             style='Accent.TButton'
         ).pack(side=tk.RIGHT)
     
-    def update_stats(self, matched: int, total: int, unmatched_keys: list = None, base_keys: list = None):
+    def _find_fixable_keys(self) -> Dict[Any, str]:
+        """
+        Find unmatched keys that exist among the base keys after a simple fix.
+        
+        Tries, in order: stripping a trailing .0, stripping whitespace and
+        lowercasing. All keys are checked at once, column-wise.
+        
+        Returns:
+            Dict of original key -> fixed key
+        """
+        keys = pd.Series(self.unmatched_keys, dtype=object)
+        s_keys = keys.astype(str)
+        
+        # Skip empty keys or 'nan' strings
+        valid = s_keys.notna() & (s_keys != '') & (s_keys.str.lower() != 'nan')
+        keys, s_keys = keys[valid], s_keys[valid]
+        if s_keys.empty:
+            return {}
+        
+        # Hashed once per set of base keys and probed for every candidate
+        base_index = self._get_base_index()
+        
+        def in_base(candidates: pd.Series) -> pd.Series:
+            return pd.Series(base_index.get_indexer(candidates) >= 0, index=candidates.index)
+        
+        # Try stripping .0
+        dot_zero = s_keys.str.slice(0, -2)
+        fixed_dot = s_keys.str.endswith('.0') & in_base(dot_zero)
+        
+        # Try stripping whitespace
+        stripped = s_keys.str.strip()
+        fixed_strip = ~fixed_dot & (stripped != s_keys) & in_base(stripped)
+        
+        # Try lowercase
+        lowered = s_keys.str.lower()
+        fixed_lower = ~fixed_dot & ~fixed_strip & (lowered != s_keys) & in_base(lowered)
+        
+        fixed = dot_zero.where(fixed_dot, stripped.where(fixed_strip, lowered))
+        fixable = fixed_dot | fixed_strip | fixed_lower
+        return dict(zip(keys[fixable], fixed[fixable]))
+    
+    def _get_base_index(self) -> pd.Index:
+        """Unique base keys as an index (built once per set of base keys)."""
+        if self._base_index is None:
+            self._base_index = pd.Index(self.base_keys).unique()
+        return self._base_index
+    
+    def update_stats(self, matched: int, total: int, unmatched_keys: list = None, base_keys: Sequence[str] = None):
         """Update match statistics display."""
         pct = (matched / total * 100) if total > 0 else 0
         unmatched = total - matched
@@ -371,8 +378,9 @@ class SourceCard(ttk.Frame):
         self.unmatched_keys = unmatched_keys or []
         
         # Store base keys for analysis
-        if base_keys:
-            self.base_keys = set(base_keys)
+        if base_keys is not None and len(base_keys):
+            self.base_keys = base_keys
+            self._base_index = None
         
         # Update unmatched link
         if unmatched > 0:
@@ -480,8 +488,6 @@ class SourcesPanel(ttk.LabelFrame):
         # Show loading state
         self.add_btn.config(state='disabled', text="⏳ Wczytywanie...")
         
-        import threading
-        
         def load_task():
             try:
                 source = DataSource(filepath=filepath)
@@ -512,24 +518,10 @@ class SourcesPanel(ttk.LabelFrame):
                 messagebox.showerror("Błąd", f"Nie można wczytać źródła:\n{error}")
                 return
             
-            # Add to sources
-            self.sources[source.id] = source
-            
-            # Create card
-            self._create_source_card(source)
-            
-            # Hide empty label
-            self.empty_label.pack_forget()
-            
-            # Notify callback
-            if self.on_source_added:
-                self.on_source_added(source)
+            self.add_source(source)
         
-        def thread_target():
-            result = load_task()
-            self.after(0, lambda: on_complete(result))
-        
-        threading.Thread(target=thread_target, daemon=True).start()
+        future = get_load_pool().submit(load_task)
+        future.add_done_callback(lambda f: f.cancelled() or call_in_ui(self, on_complete, f.result()))
     
     def add_source_from_path(self, filepath: str, sheet: Optional[str] = None, 
                               key_column: Optional[str] = None) -> Optional[DataSource]:
@@ -546,18 +538,7 @@ class SourcesPanel(ttk.LabelFrame):
             if key_column:
                 source.set_key_column(key_column)
             
-            # Add to sources
-            self.sources[source.id] = source
-            
-            # Create card
-            self._create_source_card(source)
-            
-            # Hide empty label
-            self.empty_label.pack_forget()
-            
-            # Notify callback
-            if self.on_source_added:
-                self.on_source_added(source)
+            self.add_source(source)
             
             return source
             
@@ -566,6 +547,21 @@ class SourcesPanel(ttk.LabelFrame):
             messagebox.showerror("Błąd", f"Nie można wczytać źródła:\n{e}")
             return None
     
+    def add_source(self, source: DataSource):
+        """Add an already loaded source (public API)."""
+        # Add to sources
+        self.sources[source.id] = source
+        
+        # Create card
+        self._create_source_card(source)
+        
+        # Hide empty label
+        self.empty_label.pack_forget()
+        
+        # Notify callback
+        if self.on_source_added:
+            self.on_source_added(source)
+    
     def _create_source_card(self, source: DataSource):
         """Create a card widget for a source."""
         card = SourceCard(
@@ -620,7 +616,7 @@ class SourcesPanel(ttk.LabelFrame):
         if self.on_source_removed:
             self.on_source_removed(source)
     
-    def update_match_stats(self, base_keys: List[str]):
+    def update_match_stats(self, base_keys: Sequence[str]):
         """Update match statistics for all sources."""
         for source_id, source in self.sources.items():
             stats = source.calculate_match_stats(base_keys)
@@ -59,6 +59,9 @@ class ColoredTreeview(ttk.Treeview):
         # Double-click handling
         self._double_click_callback: Optional[Callable] = None
         self.bind('<Double-1>', self._on_double_click)
+        
+        # Rows last set by bulk_update with item IDs: iid -> (values, tag)
+        self._bulk_rows: Dict[str, tuple] = {}
     
     def _setup_tags(self):
         """Configure tags for row coloring."""
@@ -117,8 +120,10 @@ class ColoredTreeview(ttk.Treeview):
     
     def clear(self):
         """Clear all items from the treeview."""
-        for item in self.get_children():
-            self.delete(item)
+        self._bulk_rows = {}
+        children = self.get_children()
+        if children:
+            self.delete(*children)
     
     def add_row(self, values: tuple, tag: str = 'unchanged', **kwargs) -> str:
         """
@@ -148,6 +153,46 @@ class ColoredTreeview(ttk.Treeview):
         for values, tag in zip(rows, tags):
             self.add_row(values, tag)
     
+    def bulk_update(self, rows: List[tuple], iids: Optional[List[str]] = None):
+        """
+        Replace all rows at once.
+        
+        With item IDs, rows that are already shown are kept: only new rows are
+        inserted, changed rows updated and missing ones deleted.
+        
+        Args:
+            rows: List of (values, tag) tuples
+            iids: Optional item IDs for the rows (generated by Tk if not given)
+        """
+        insert = self.insert
+        if iids is None:
+            self.clear()
+            for values, tag in rows:
+                insert('', tk.END, values=values, tags=(tag,))
+            return
+        
+        current = self.get_children()
+        keep = set(iids)
+        stale = [iid for iid in current if iid not in keep]
+        if stale:
+            self.delete(*stale)
+        
+        existing = set(current)
+        previous = self._bulk_rows
+        for index, (iid, row) in enumerate(zip(iids, rows)):
+            values, tag = row
+            if iid not in existing:
+                insert('', index, iid=iid, values=values, tags=(tag,))
+            elif previous.get(iid) != row:
+                self.item(iid, values=values, tags=(tag,))
+        
+        # Restore the order if rows were moved
+        if list(self.get_children()) != list(iids):
+            for index, iid in enumerate(iids):
+                self.move(iid, '', index)
+        
+        self._bulk_rows = dict(zip(iids, rows))
+    
     def update_row(self, item_id: str, values: tuple, tag: Optional[str] = None):
         """
         Update an existing row.
@@ -217,6 +262,11 @@ class MappingsTreeview(ColoredTreeview):
 class PreviewTreeview(ColoredTreeview):
     """
     Specialized Treeview for data preview with status icons.
+    
+    Rows set with set_virtual_rows are materialized only for the visible
+    viewport; scrolling reuses a small pool of items. The scrollbar, wheel,
+    arrow and page keys move the virtual viewport; see() and yview() on
+    the pooled items are not supported for virtual rows.
     """
     
     # Unicode status indicators
@@ -232,10 +282,46 @@ class PreviewTreeview(ColoredTreeview):
         # Add status column
         all_columns = ['Status'] + columns
         super().__init__(master, columns=all_columns, **kwargs)
+        self._setup_status_column()
+        
+        # Virtual rows state
+        self._virtual_count = 0
+        self._virtual_get_row: Optional[Callable[[int], tuple]] = None
+        self._virtual_top = 0
+        self._item_pool: List[str] = []
+        self._attached = 0
+        self._row_metrics: Optional[tuple] = None  # (first row y, row height), measured
         
+        # The scrollbar follows the virtual rows, not the materialized items
+        self.configure(yscrollcommand='')
+        self.v_scroll.configure(command=self._on_scrollbar)
+        self.bind('<Configure>', self._on_configure)
+        self.bind('<MouseWheel>', self._on_mousewheel)
+        self.bind('<Button-4>', lambda e: self._scroll_virtual(-3))
+        self.bind('<Button-5>', lambda e: self._scroll_virtual(3))
+        self.bind('<Down>', lambda e: self._on_arrow_key(1))
+        self.bind('<Up>', lambda e: self._on_arrow_key(-1))
+        self.bind('<Next>', lambda e: self._scroll_virtual(self._viewport_rows()))
+        self.bind('<Prior>', lambda e: self._scroll_virtual(-self._viewport_rows()))
+    
+    def _setup_status_column(self):
+        """Configure the status icon column."""
         self.column('Status', width=60, anchor=tk.CENTER)
         self.heading('Status', text='', anchor=tk.CENTER)
     
+    def set_data_columns(self, columns: List[str]):
+        """Replace the data columns in place, keeping the status column."""
+        self.clear()
+        self.set_columns(['Status'] + list(columns))
+        self['displaycolumns'] = '#all'
+        self._setup_status_column()
+    
+    def _status_values(self, values: tuple, status: Optional[str]) -> tuple:
+        """Prefix values with the status icon (status None = plain row)."""
+        if status is None:
+            return values
+        return (self.ICONS.get(status, '⚪'),) + values
+    
     def add_row_with_status(self, values: tuple, status: str = 'unchanged') -> str:
         """
         Add a row with status icon.
@@ -247,6 +333,144 @@ class PreviewTreeview(ColoredTreeview):
         Returns:
             Item ID
         """
-        icon = self.ICONS.get(status, '⚪')
-        full_values = (icon,) + values
-        return self.add_row(full_values, tag=status)
+        return self.add_row(self._status_values(values, status), tag=status)
+    
+    def set_virtual_rows(self, count: int, get_row: Callable[[int], tuple]):
+        """
+        Show rows that are built on demand while scrolling.
+        
+        Args:
+            count: Total number of rows
+            get_row: Returns (values, status) for a row position; values
+                are without the status column, status None shows them as-is
+        """
+        self._virtual_count = count
+        self._virtual_get_row = get_row
+        self._virtual_top = 0
+        self._render_virtual()
+    
+    def clear(self):
+        """Clear all items, including the virtual rows."""
+        self._virtual_count = 0
+        self._virtual_get_row = None
+        self._virtual_top = 0
+        if self._item_pool:
+            self.delete(*self._item_pool)
+        self._item_pool = []
+        self._attached = 0
+        super().clear()
+        self.v_scroll.set(0, 1)
+    
+    def _on_configure(self, event=None):
+        """Re-measure rows and refill the viewport after a resize or restyle."""
+        self._row_metrics = None
+        self._render_virtual()
+    
+    def _measure_rows(self) -> Optional[tuple]:
+        """(first row y, row height) from a rendered item, cached until <Configure>."""
+        if self._row_metrics is None and self._attached:
+            bbox = self.bbox(self._item_pool[0])
+            if bbox:
+                self._row_metrics = (bbox[1], bbox[3])
+        return self._row_metrics
+    
+    def _viewport_rows(self) -> int:
+        """Number of rows that fit in the visible area."""
+        height = self.winfo_height()
+        if height <= 1:
+            # Not mapped yet
+            return int(self.cget('height'))
+        
+        metrics = self._measure_rows()
+        if metrics:
+            first_y, row_height = metrics
+            return max(1, (height - first_y) // row_height)
+        
+        # Nothing rendered to measure yet - estimate from this widget's style
+        try:
+            style = self.cget('style') or 'Treeview'
+            row_height = int(ttk.Style(self).lookup(style, 'rowheight') or 20)
+        except (ValueError, tk.TclError):
+            row_height = 20
+        # One row height is taken by the headings
+        return max(1, height // row_height - 1)
+    
+    def _render_virtual(self):
+        """Fill the pooled items with the rows in the viewport."""
+        if self._virtual_get_row is None:
+            return
+        
+        count = self._virtual_count
+        measured = self._row_metrics is not None
+        visible = self._viewport_rows()
+        top = max(0, min(self._virtual_top, count - visible))
+        self._virtual_top = top
+        shown = min(visible, count - top)
+        
+        pool = self._item_pool
+        for k in range(shown):
+            values, status = self._virtual_get_row(top + k)
+            values = self._status_values(values, status)
+            tags = (status or 'unchanged',)
+            if k < len(pool):
+                self.item(pool[k], values=values, tags=tags)
+                if k >= self._attached:
+                    self.move(pool[k], '', k)
+            else:
+                pool.append(self.insert('', tk.END, values=values, tags=tags))
+        
+        if shown < self._attached:
+            self.detach(*pool[shown:self._attached])
+        self._attached = shown
+        
+        # Keep the pooled items at the top of the widget's own view
+        self.yview_moveto(0)
+        
+        # Sized from the style estimate - refill once the real row height is known
+        if not measured and self._measure_rows() and self._viewport_rows() != visible:
+            self._render_virtual()
+            return
+        
+        if count:
+            self.v_scroll.set(top / count, (top + shown) / count)
+        else:
+            self.v_scroll.set(0, 1)
+    
+    def _scroll_virtual(self, rows: int):
+        """Move the viewport by a number of rows."""
+        if self._virtual_get_row is None:
+            return
+        self._virtual_top += rows
+        self._render_virtual()
+        return 'break'
+    
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar drag and arrow clicks."""
+        if self._virtual_get_row is None:
+            return
+        if args[0] == 'moveto':
+            self._virtual_top = int(float(args[1]) * self._virtual_count)
+            self._render_virtual()
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self._viewport_rows()
+            self._scroll_virtual(step)
+    
+    def _on_mousewheel(self, event):
+        """Scroll by the wheel (Windows reports multiples of 120, macOS small deltas)."""
+        if abs(event.delta) >= 120:
+            rows = -3 * (event.delta // 120)
+        else:
+            rows = -event.delta
+        return self._scroll_virtual(rows)
+    
+    def _on_arrow_key(self, direction: int):
+        """Scroll when moving the selection past the first/last visible row."""
+        items = self.get_children()
+        focus = self.focus()
+        if not items or not focus:
+            return
+        edge = items[-1] if direction > 0 else items[0]
+        if focus == edge:
+            return self._scroll_virtual(direction)
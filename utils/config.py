@@ -66,6 +66,10 @@ class Config:
     # Automation
     file_patterns: List[Dict[str, str]] = field(default_factory=list)  # [{"pattern": "regex", "profile": "path"}]
     
+    def __post_init__(self):
+        # Not a dataclass field, so it is never written to config.json
+        self.dirty = False
+    
     @classmethod
     def load(cls) -> 'Config':
         """Load configuration from file."""
@@ -90,6 +94,12 @@ class Config:
         
         with open(config_path, 'w', encoding='utf-8') as f:
             json.dump(asdict(self), f, indent=2, ensure_ascii=False)
+        
+        self.dirty = False
+    
+    def mark_dirty(self) -> None:
+        """Flag in-memory changes that still need to be saved."""
+        self.dirty = True
     
     def add_recent_base_file(self, filepath: str) -> None:
         """Add a file to recent base files."""
@@ -97,7 +107,7 @@ class Config:
             self.recent_base_files.remove(filepath)
         self.recent_base_files.insert(0, filepath)
         self.recent_base_files = self.recent_base_files[:self.max_recent]
-        self.save()
+        self.mark_dirty()
     
     def add_recent_source_file(self, filepath: str) -> None:
         """Add a file to recent source files."""
@@ -105,7 +115,7 @@ class Config:
             self.recent_source_files.remove(filepath)
         self.recent_source_files.insert(0, filepath)
         self.recent_source_files = self.recent_source_files[:self.max_recent]
-        self.save()
+        self.mark_dirty()
     
     def add_recent_profile(self, filepath: str) -> None:
         """Add a profile to recent profiles."""
@@ -113,7 +123,7 @@ class Config:
             self.recent_profiles.remove(filepath)
         self.recent_profiles.insert(0, filepath)
         self.recent_profiles = self.recent_profiles[:self.max_recent]
-        self.save()
+        self.mark_dirty()
     
     def get_profiles_directory(self) -> Path:
         """Get the directory for storing profiles."""
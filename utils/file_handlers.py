@@ -1,13 +1,23 @@
 """
 File handlers module - loading various file formats.
 """
+import io
 import os
+import importlib.util
 from typing import Tuple, List, Optional, Dict, Any
 from pathlib import Path
 
 import pandas as pd
 import chardet
 
+# python-calamine (Rust Excel reader) is used through pandas' 'calamine' engine (pandas >= 2.2)
+HAS_CALAMINE = (
+    importlib.util.find_spec('python_calamine') is not None
+    and tuple(int(p) for p in pd.__version__.split('.')[:2]) >= (2, 2)
+)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls', '.xlsm', '.xlsb')
+
 
 def detect_encoding(filepath: str, sample_size: int = 10000) -> str:
     """
@@ -68,33 +78,51 @@ def detect_separator(filepath: str, encoding: str = 'utf-8') -> str:
     return best_sep if counts[best_sep] > 0 else ','
 
 
-def load_excel(filepath: str, sheet: Optional[str] = None) -> Tuple[pd.DataFrame, List[str]]:
+def open_excel(filepath: str, in_memory: bool = False) -> pd.ExcelFile:
     """
-    Load an Excel file.
+    Open an Excel workbook without parsing any sheet.
     
     Args:
         filepath: Path to the Excel file
-        sheet: Optional sheet name to load
+        in_memory: Read the file into memory so no handle stays open
+            (for workbooks kept around to switch sheets)
         
     Returns:
-        Tuple of (DataFrame, list of sheet names)
+        Opened pandas ExcelFile
     """
     ext = Path(filepath).suffix.lower()
     
     # Determine engine
-    if ext == '.xls':
+    if HAS_CALAMINE:
+        engine = 'calamine'
+    elif ext == '.xls':
         engine = 'xlrd'
     elif ext == '.xlsb':
         engine = 'pyxlsb'
     else:
         engine = 'openpyxl'
     
-    # Get sheet names
     try:
-        xl = pd.ExcelFile(filepath, engine=engine)
-        sheet_names = xl.sheet_names
+        if in_memory:
+            with open(filepath, 'rb') as f:
+                return pd.ExcelFile(io.BytesIO(f.read()), engine=engine)
+        return pd.ExcelFile(filepath, engine=engine)
     except Exception as e:
         raise ValueError(f"Nie można otworzyć pliku Excel: {e}")
+
+
+def read_excel_sheet(xl: pd.ExcelFile, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse a single sheet of an opened workbook.
+    
+    Args:
+        xl: Workbook returned by open_excel
+        sheet: Optional sheet name to load (first sheet if not given)
+        
+    Returns:
+        DataFrame with the sheet data
+    """
+    sheet_names = xl.sheet_names
     
     # Load specified sheet or first one
     target_sheet = sheet if sheet else sheet_names[0]
@@ -102,9 +130,23 @@ def load_excel(filepath: str, sheet: Optional[str] = None) -> Tuple[pd.DataFrame
     if target_sheet not in sheet_names:
         raise ValueError(f"Arkusz '{target_sheet}' nie istnieje. Dostępne: {sheet_names}")
     
-    df = pd.read_excel(filepath, sheet_name=target_sheet, engine=engine)
+    return xl.parse(sheet_name=target_sheet)
+
+
+def load_excel(filepath: str, sheet: Optional[str] = None) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Load an Excel file.
     
-    return df, sheet_names
+    Args:
+        filepath: Path to the Excel file
+        sheet: Optional sheet name to load
+        
+    Returns:
+        Tuple of (DataFrame, list of sheet names)
+    """
+    # Parse through the opened workbook instead of reopening the file
+    with open_excel(filepath) as xl:
+        return read_excel_sheet(xl, sheet), xl.sheet_names
 
 
 def load_csv(filepath: str, encoding: Optional[str] = None, 
@@ -172,7 +214,7 @@ def load_file(filepath: str, sheet: Optional[str] = None) -> Tuple[pd.DataFrame,
     
     ext = Path(filepath).suffix.lower()
     
-    if ext in ['.xlsx', '.xls', '.xlsm', '.xlsb']:
+    if ext in EXCEL_EXTENSIONS:
         return load_excel(filepath, sheet)
     elif ext in ['.csv', '.tsv', '.txt']:
         return load_csv(filepath)
@@ -197,7 +239,7 @@ def get_file_info(filepath: str) -> Dict[str, Any]:
         'extension': path.suffix.lower(),
         'size_bytes': path.stat().st_size,
         'size_mb': path.stat().st_size / (1024 * 1024),
-        'is_excel': path.suffix.lower() in ['.xlsx', '.xls', '.xlsm', '.xlsb'],
+        'is_excel': path.suffix.lower() in EXCEL_EXTENSIONS,
         'is_csv': path.suffix.lower() in ['.csv', '.tsv', '.txt']
     }
 
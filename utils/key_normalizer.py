@@ -7,6 +7,7 @@ import pandas as pd
 
 # Values considered as empty
 EMPTY_VALUES = [None, '', 'NULL', 'N/A', '#N/A', '-', 'brak', 'BRAK', 'nan', 'NaN', 'NAN', 'none', 'None', 'NONE']
+_EMPTY_UPPER = [v.upper() for v in EMPTY_VALUES if v]
 
 
 def normalize_key(value: Any, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
@@ -77,6 +78,57 @@ def normalize_key(value: Any, options: Optional[Dict[str, Any]] = None) -> Optio
     return s
 
 
+def normalize_keys(series: pd.Series, options: Optional[Dict[str, Any]] = None) -> pd.Series:
+    """
+    Vectorized normalize_key for a whole column.
+    
+    Args:
+        series: Key values to normalize
+        options: Same options as normalize_key
+        
+    Returns:
+        Series of normalized string keys (None where empty)
+    """
+    options = options or {}
+    
+    na = series.isna()
+    s = series.astype(str).str.strip()
+    
+    # Check if empty
+    empty = na | (s == '') | s.str.upper().isin(_EMPTY_UPPER)
+    stripped = s
+    
+    # Remove .0 from floats (Excel often converts int to float)
+    if options.get('strip_decimal', True):
+        head = s.str[:-2]
+        dot_zero = s.str.endswith('.0') & head.str.replace('-', '', regex=False).str.isdigit()
+        s = s.where(~dot_zero, head)
+    
+    # Remove double spaces
+    s = s.str.replace(r' {2,}', ' ', regex=True)
+    
+    # Apply options
+    if options.get('case_insensitive', False):
+        s = s.str.lower()
+    
+    if options.get('strip_leading_zeros', False):
+        # Preserve at least one zero
+        s = s.str.lstrip('0').replace('', '0')
+    
+    # Normalize paths (for category/structure matching)
+    if options.get('normalize_paths', False):
+        s = (s.str.replace('"', '', regex=False).str.replace("'", '', regex=False)
+              .str.replace(' > ', '/', regex=False).str.replace('>', '/', regex=False)
+              .str.replace(' / ', '/', regex=False).str.replace('\\', '/', regex=False)
+              .str.replace(' ', '', regex=False).str.lower()
+              .str.replace(r'/+', '/', regex=True).str.strip('/'))
+    
+    # Empty values are None (or kept as stripped text, like normalize_key)
+    s = s.astype(object)
+    s = s.where(~empty, None if options.get('treat_empty_as_null', True) else stripped.astype(object))
+    return s.where(~na, None)
+
+
 def is_empty(value: Any) -> bool:
     """
     Check if a value is considered empty.
@@ -199,7 +251,7 @@ def get_key_stats(df: pd.DataFrame, key_column: str,
         }
     
     # Normalize all keys
-    normalized = df[key_column].apply(lambda x: normalize_key(x, options))
+    normalized = normalize_keys(df[key_column], options)
     
     total = len(df)
     empty_count = normalized.isna().sum()
@@ -209,10 +261,11 @@ def get_key_stats(df: pd.DataFrame, key_column: str,
     value_counts = non_empty.value_counts()
     
     unique_count = len(value_counts)
-    duplicate_count = sum(1 for count in value_counts if count > 1)
+    duplicated = value_counts[value_counts > 1]
+    duplicate_count = len(duplicated)
     
     # Get actual duplicate keys (first 100)
-    duplicate_keys = [key for key, count in value_counts.items() if count > 1][:100]
+    duplicate_keys = duplicated.index[:100].tolist()
     
     return {
         'total': total,
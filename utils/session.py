@@ -2,14 +2,21 @@
 Session Manager - Save and restore application sessions.
 """
 import json
+import os
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+# Try to import orjson for faster session (de)serialization
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 def get_session_path() -> Path:
     """Get path to session file."""
-    import os
     appdata = os.environ.get('APPDATA', os.path.expanduser('~'))
     return Path(appdata) / 'DataMatcherPro' / 'last_session.json'
 
@@ -39,8 +46,23 @@ class SessionManager:
             
             session_data['saved_at'] = datetime.now().isoformat()
             
-            with open(session_path, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            if HAS_ORJSON:
+                data = orjson.dumps(
+                    session_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                )
+                # Write the bytes straight to the descriptor (no buffered writer)
+                flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+                fd = os.open(session_path, flags, 0o644)
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+            else:
+                with open(session_path, 'w', encoding='utf-8') as f:
+                    json.dump(session_data, f, indent=2, ensure_ascii=False)
             
             return True
         except Exception as e:
@@ -56,6 +78,8 @@ class SessionManager:
             if not session_path.exists():
                 return None
             
+            if HAS_ORJSON:
+                return orjson.loads(session_path.read_bytes())
             with open(session_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
@@ -3,10 +3,78 @@ Worker utilities - background thread for long-running operations.
 """
 import threading
 import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Any, Optional
 from dataclasses import dataclass
 
 
+# Shared pool for file loads (created on first use)
+_load_pool: Optional[ThreadPoolExecutor] = None
+
+# Single worker for diff exports (created on first use)
+_export_pool: Optional[ThreadPoolExecutor] = None
+
+# Set when the application is closing; long loops on worker threads check it,
+# since pool workers are joined at interpreter exit
+_shutdown_event = threading.Event()
+
+
+def request_shutdown() -> None:
+    """Ask long-running worker loops to stop (see shutdown_requested)."""
+    _shutdown_event.set()
+
+
+def shutdown_requested() -> bool:
+    """True once the application is closing."""
+    return _shutdown_event.is_set()
+
+
+def get_load_pool() -> ThreadPoolExecutor:
+    """Get the thread pool used for loading data files."""
+    global _load_pool
+    if _load_pool is None:
+        _load_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='datamatcher-load')
+    return _load_pool
+
+
+def get_export_pool() -> ThreadPoolExecutor:
+    """Get the thread pool used for writing diff exports."""
+    global _export_pool
+    if _export_pool is None:
+        _export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='datamatcher-export')
+    return _export_pool
+
+
+def shutdown_load_pool() -> None:
+    """
+    Stop the load pool without waiting; queued loads are cancelled.
+    
+    A load that already started still runs to the end of its file read
+    (pandas/openpyxl reads cannot be interrupted) and exit waits for it;
+    the key lookup build that follows a source load stops early once
+    request_shutdown() was called.
+    """
+    global _load_pool
+    if _load_pool is not None:
+        _load_pool.shutdown(wait=False, cancel_futures=True)
+        _load_pool = None
+
+
+def call_in_ui(widget, callback: Callable, *args) -> None:
+    """
+    Schedule callback on the Tk thread via widget.after, unless the widget is gone.
+    
+    Safe to call from worker threads and from done callbacks of futures
+    that finish after the window was closed.
+    """
+    try:
+        if widget.winfo_exists():
+            widget.after(0, callback, *args)
+    except (RuntimeError, tk.TclError):
+        pass  # Application already destroyed
+
+
 @dataclass
 class WorkerResult:
     """Result from a worker operation."""